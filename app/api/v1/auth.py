@@ -1,14 +1,28 @@
 # app/api/v1/auth.py
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks
 from pydantic import BaseModel, EmailStr
 from app.db.documents import User
-from app.services.auth import hash_password, verify_password, create_access_token, decode_access_token, TokenData
+from app.services.auth import async_hash_password, async_verify_password, password_needs_rehash, create_access_token, decode_access_token, token_digest, TokenData
 from beanie import PydanticObjectId
 from beanie.exceptions import CollectionWasNotInitialized
+from cachetools import TTLCache
+from pymongo.errors import DuplicateKeyError
 from uuid import uuid4
+import copy
+import time
+from app.core.config import settings
 
-# In-memory user store fallback for environments without Mongo
+# In-memory user store fallback for environments without Mongo (USE_INMEM_FALLBACK).
+# When disabled the except clauses below match nothing and errors propagate.
 _INMEM_USERS: dict[str, dict] = {}
+_INMEM_ERRORS = (CollectionWasNotInitialized,) if settings.USE_INMEM_FALLBACK else ()
+# ValueError: ids minted by the in-memory fallback are UUIDs, not ObjectIds.
+# Without the fallback a non-ObjectId id is just an invalid token (see get_current_user).
+_INMEM_LOOKUP_ERRORS = ((ValueError,) + _INMEM_ERRORS) if settings.USE_INMEM_FALLBACK else ()
+
+async def _find_user_by_email(email: str):
+    # single indexed lookup on the unique email index
+    return await User.find_one({"email": email})
 
 router = APIRouter()
 
@@ -27,34 +41,47 @@ class TokenOut(BaseModel):
 @router.post("/auth/signup", status_code=201)
 async def signup(payload: SignupIn):
     try:
-        existing = await User.find_one({"email": payload.email})
-        if existing:
+        u = User(email=payload.email, password_hash=await async_hash_password(payload.password))
+        try:
+            # single round-trip: the unique index on email rejects duplicates
+            await u.insert()
+        except DuplicateKeyError:
             raise HTTPException(status_code=400, detail="Email already registered")
-        u = User(email=payload.email, password_hash=hash_password(payload.password))
-        await u.insert()
         token = create_access_token(str(u.id))
         return {"access_token": token, "token_type": "bearer"}
-    except CollectionWasNotInitialized:
+    except _INMEM_ERRORS:
         # fallback to in-memory store
         if any(u["email"] == payload.email for u in _INMEM_USERS.values()):
             raise HTTPException(status_code=400, detail="Email already registered")
         uid = str(uuid4())
-        _INMEM_USERS[uid] = {"id": uid, "email": payload.email, "password_hash": hash_password(payload.password)}
+        _INMEM_USERS[uid] = {"id": uid, "email": payload.email, "password_hash": await async_hash_password(payload.password)}
         token = create_access_token(uid)
         return {"access_token": token, "token_type": "bearer"}
 
+async def _upgrade_password_hash(user, password: str) -> None:
+    # Re-hash with current argon2 parameters after a successful login.
+    new_hash = await async_hash_password(password)
+    if isinstance(user, dict):
+        user["password_hash"] = new_hash
+    else:
+        await user.set({User.password_hash: new_hash})
+
 @router.post("/auth/login", response_model=TokenOut)
-async def login(payload: LoginIn):
+async def login(payload: LoginIn, background: BackgroundTasks):
     try:
-        user = await User.find_one({"email": payload.email})
-        if not user or not verify_password(payload.password, user.password_hash):
+        user = await _find_user_by_email(payload.email)
+        if not user or not await async_verify_password(payload.password, user.password_hash):
             raise HTTPException(status_code=401, detail="Invalid credentials")
+        if password_needs_rehash(user.password_hash):
+            background.add_task(_upgrade_password_hash, user, payload.password)
         token = create_access_token(str(user.id))
         return {"access_token": token, "token_type": "bearer"}
-    except CollectionWasNotInitialized:
+    except _INMEM_ERRORS:
         # fallback to in-memory
         for u in _INMEM_USERS.values():
-            if u["email"] == payload.email and verify_password(payload.password, u["password_hash"]):
+            if u["email"] == payload.email and await async_verify_password(payload.password, u["password_hash"]):
+                if password_needs_rehash(u["password_hash"]):
+                    background.add_task(_upgrade_password_hash, u, payload.password)
                 token = create_access_token(u["id"])
                 return {"access_token": token, "token_type": "bearer"}
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -63,8 +90,28 @@ async def login(payload: LoginIn):
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 security = HTTPBearer()
 
+# Short-lived cache of verified tokens -> (exp, user) so an active session
+# skips the JWT verify and the Mongo lookup on every request. Tokens are stateless
+# JWTs (there is no logout / revocation), so entries simply age out with the TTL.
+_TOKEN_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=settings.AUTH_TOKEN_CACHE_TTL_SEC)
+
+def _token_cache_key(token: str) -> bytes:
+    return token_digest(token)
+
+def _user_copy(user):
+    # each request gets its own copy, so one handler mutating it can't leak into another
+    return user.model_copy() if hasattr(user, "model_copy") else copy.copy(user)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
+    key = _token_cache_key(token)
+    cached = _TOKEN_CACHE.get(key)
+    if cached is not None:
+        exp, user = cached
+        if exp is None or exp > time.time():
+            return _user_copy(user)
+        _TOKEN_CACHE.pop(key, None)
+
     try:
         td = decode_access_token(token)
     except Exception:
@@ -75,8 +122,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         user = await User.get(td.sub)
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
-        return user
-    except CollectionWasNotInitialized:
+    except _INMEM_LOOKUP_ERRORS:
         u = _INMEM_USERS.get(td.sub)
         if not u:
             raise HTTPException(status_code=401, detail="User not found")
@@ -86,4 +132,8 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 self.id = d.get("id")
                 self.email = d.get("email")
                 self.password_hash = d.get("password_hash")
-        return SimpleUser(u)
+        user = SimpleUser(u)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    _TOKEN_CACHE[key] = (td.exp, _user_copy(user))
+    return user
@@ -6,23 +6,38 @@ from typing import Optional
 from pydantic import BaseModel
 from beanie.exceptions import CollectionWasNotInitialized
 from uuid import uuid4
+from app.core.config import settings
 
 router = APIRouter()
 
 # Simple in-memory fallback store used when Beanie/collection is not initialized
+# (dev/test only, enabled with USE_INMEM_FALLBACK)
 _INMEM_STORE = {
     "jobs": {},
     "resumes": {},
     "assessments": {},
 }
+_INMEM_ERRORS = (CollectionWasNotInitialized,) if settings.USE_INMEM_FALLBACK else ()
+# ValueError: the id can't be parsed as an ObjectId (e.g. a UUID from the in-memory store).
+# Without the fallback such an id simply matches nothing (404).
+_INMEM_LOOKUP_ERRORS = ((ValueError,) + _INMEM_ERRORS) if settings.USE_INMEM_FALLBACK else ()
+
+def _from_doc(model, doc):
+    """
+    Build a response model from a stored document without validating it again;
+    FastAPI still validates the returned value against response_model once.
+    """
+    data = {name: getattr(doc, name, None) for name in model.model_fields}
+    data["id"] = str(doc.id)
+    return model.model_construct(**data)
 
 @router.post("/jobs", response_model=JobResp)
 async def create_job(payload: JobCreate):
     try:
         job = JobPosting(source_url=str(payload.source_url) if payload.source_url else None, raw_text=payload.raw_text)
         await job.insert()
-        return JobResp.from_orm(job)
-    except CollectionWasNotInitialized:
+        return _from_doc(JobResp, job)
+    except _INMEM_ERRORS:
         jid = str(uuid4())
         _INMEM_STORE["jobs"][jid] = {"id": jid, "source_url": str(payload.source_url) if payload.source_url else None, "raw_text": payload.raw_text}
         return _INMEM_STORE["jobs"][jid]
@@ -31,24 +46,26 @@ async def create_job(payload: JobCreate):
 async def get_job(job_id: str):
     try:
         job = await JobPosting.get(job_id)
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-        return JobResp.from_orm(job)
-    except Exception:
+    except _INMEM_LOOKUP_ERRORS:
         # Fall back to in-memory store if Beanie isn't initialized or if the
         # document id can't be parsed (e.g. UUID used instead of ObjectId).
         j = _INMEM_STORE["jobs"].get(job_id)
         if not j:
             raise HTTPException(status_code=404, detail="Job not found")
         return j
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _from_doc(JobResp, job)
 
 @router.post("/resumes/db-save", response_model=ResumeResp)
 async def create_resume(payload: ResumeCreate):
     try:
         resume = Resume(original_filename=payload.original_filename, storage_key=payload.storage_key)
         await resume.insert()
-        return ResumeResp.from_orm(resume)
-    except CollectionWasNotInitialized:
+        return _from_doc(ResumeResp, resume)
+    except _INMEM_ERRORS:
         rid = str(uuid4())
         _INMEM_STORE["resumes"][rid] = {"id": rid, "original_filename": payload.original_filename, "storage_key": payload.storage_key}
         return _INMEM_STORE["resumes"][rid]
@@ -57,35 +74,44 @@ async def create_resume(payload: ResumeCreate):
 async def get_resume(resume_id: str):
     try:
         resume = await Resume.get(resume_id)
-        if not resume:
-            raise HTTPException(status_code=404, detail="Resume not found")
-        return ResumeResp.from_orm(resume)
-    except Exception:
+    except _INMEM_LOOKUP_ERRORS:
         r = _INMEM_STORE["resumes"].get(resume_id)
         if not r:
             raise HTTPException(status_code=404, detail="Resume not found")
         return r
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return _from_doc(ResumeResp, resume)
+
+def _new_assessment(payload: AssessmentCreate) -> Assessment:
+    return Assessment(job_id=payload.job_id, resume_id=payload.resume_id, user_id=payload.user_id)
+
+def _inmem_assessment() -> dict:
+    aid = str(uuid4())
+    _INMEM_STORE["assessments"][aid] = {"id": aid, "score": None, "results_json": None}
+    return _INMEM_STORE["assessments"][aid]
 
 @router.post("/assessments/create", response_model=AssessmentResp)
 async def create_assessment(payload: AssessmentCreate):
     try:
-        a = Assessment(job=payload.job_id, resume=payload.resume_id, user=payload.user_id)
+        a = _new_assessment(payload)
         await a.insert()
-        return AssessmentResp.from_orm(a)
-    except CollectionWasNotInitialized:
-        aid = str(uuid4())
-        _INMEM_STORE["assessments"][aid] = {"id": aid, "score": None, "results_json": None}
-        return _INMEM_STORE["assessments"][aid]
+        return _from_doc(AssessmentResp, a)
+    except _INMEM_ERRORS:
+        return _inmem_assessment()
 
-@router.get("/assessments/{assessment_id}", response_model=AssessmentResp)
-async def get_assessment(assessment_id: str):
+@router.post("/assessments/bulk", response_model=list[AssessmentResp])
+async def create_assessments_bulk(payload: list[AssessmentCreate]):
+    """Create many assessments with one insert_many round-trip instead of one insert each."""
+    if not payload:
+        return []
     try:
-        a = await Assessment.get(assessment_id)
-        if not a:
-            raise HTTPException(status_code=404, detail="Assessment not found")
-        return AssessmentResp.from_orm(a)
-    except Exception:
-        a = _INMEM_STORE["assessments"].get(assessment_id)
-        if not a:
-            raise HTTPException(status_code=404, detail="Assessment not found")
-        return a
+        docs = [_new_assessment(p) for p in payload]
+        res = await Assessment.insert_many(docs, ordered=False)
+        for doc, oid in zip(docs, res.inserted_ids):
+            doc.id = oid
+        return [_from_doc(AssessmentResp, d) for d in docs]
+    except _INMEM_ERRORS:
+        return [_inmem_assessment() for _ in payload]
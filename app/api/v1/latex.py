@@ -1,9 +1,9 @@
 # app/api/v1/latex.py
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Request
+from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import Optional
-import asyncio
-from app.services.latex_compiler import compile_latex
+from app.services.latex_compiler import compile_latex, load_template, apply_patches, run_compile, CompilerBusy, DEFAULT_TIMEOUT
 from app.api.v1.auth import get_current_user  # optional auth
 import base64
 import json
@@ -12,6 +12,9 @@ import logging
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Tail of the compile log (bytes) echoed back in the X-Compile-Log header
+_LOG_HEADER_BYTES = 3072
+
 class CompileRequest(BaseModel):
     tex_source: Optional[str] = None
     template_name: Optional[str] = None  # e.g., "onepage.tex"
@@ -19,11 +22,13 @@ class CompileRequest(BaseModel):
     timeout_sec: Optional[int] = None
 
 @router.post("/latex/compile")
-async def compile_endpoint(req: CompileRequest, current_user = Depends(get_current_user)):
+async def compile_endpoint(req: CompileRequest, request: Request, current_user = Depends(get_current_user)):
     """
     Compile LaTeX source or template+patches to PDF.
     Request body: {tex_source | template_name + patches}
-    Returns: {success:bool, log:str, pdf_base64: str|None}
+    Returns: application/pdf body; the tail of the compile log is sent base64-encoded
+    in the X-Compile-Log header. Clients that send `Accept: application/json`
+    (without application/pdf) get the legacy {compiled, log, pdf_base64} JSON instead.
     """
     if not req.tex_source and not req.template_name:
         raise HTTPException(status_code=400, detail="Either tex_source or template_name required")
@@ -32,26 +37,31 @@ async def compile_endpoint(req: CompileRequest, current_user = Depends(get_curre
     if req.tex_source:
         tex = req.tex_source
     else:
-        # load template file
-        from pathlib import Path
-        from app.services.latex_compiler import TEMPLATES_DIR
-        template_path = TEMPLATES_DIR / req.template_name
-        if not template_path.exists():
+        # load template file (cached until it changes on disk)
+        try:
+            tex = load_template(req.template_name)
+        except FileNotFoundError:
             raise HTTPException(status_code=400, detail="Template not found")
-        tex = template_path.read_text(encoding="utf-8")
         # apply simple patches replacing {{key}} placeholders
-        if req.patches:
-            for k, v in (req.patches.items()):
-                tex = tex.replace(f"{{{{{k}}}}}", str(v))
+        tex = apply_patches(tex, req.patches)
 
-    # Run compile in threadpool
-    loop = asyncio.get_event_loop()
-    timeout = req.timeout_sec or None
-    success, pdf_bytes, log = await loop.run_in_executor(None, compile_latex, tex, None, timeout or None)
+    # Run compile on the dedicated compile pool
+    timeout = req.timeout_sec or DEFAULT_TIMEOUT
+    try:
+        success, pdf_bytes, log = await run_compile(compile_latex, tex, None, timeout)
+    except CompilerBusy:
+        raise HTTPException(status_code=429, detail="LaTeX compiler busy, retry later")
 
     if not success:
         raise HTTPException(status_code=500, detail={"compiled": False, "log": log})
 
-    # base64 encode pdf to return JSON safely (or stream directly)
-    pdf_b64 = base64.b64encode(pdf_bytes).decode("ascii")
-    return {"compiled": True, "log": log, "pdf_base64": pdf_b64}
+    accept = request.headers.get("accept", "")
+    if "application/json" in accept and "application/pdf" not in accept:
+        # legacy JSON clients: base64 encode pdf to return JSON safely
+        pdf_b64 = base64.b64encode(pdf_bytes).decode("ascii")
+        return {"compiled": True, "log": log, "pdf_base64": pdf_b64}
+
+    # pdf bytes are already in memory, so send them as-is (no base64, no streaming wrapper)
+    log_tail = log.encode("utf-8")[-_LOG_HEADER_BYTES:]
+    headers = {"X-Compile-Log": base64.b64encode(log_tail).decode("ascii")}
+    return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
@@ -2,11 +2,11 @@
 from fastapi import APIRouter, HTTPException, Depends, Body
 from pydantic import BaseModel
 from typing import Optional
-import asyncio
 from app.api.v1.auth import get_current_user
-from app.services.latex_tectonic_runner import compile_tex_with_tectonic
-from fastapi.responses import StreamingResponse
-import io
+from app.services.latex_tectonic_runner import compile_tex_to_pdf_file, discard_pdf, DEFAULT_IMAGE, DEFAULT_TIMEOUT
+from app.services.latex_compiler import load_template, apply_patches, compile_slot, CompilerBusy
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
 
 router = APIRouter()
 
@@ -21,7 +21,7 @@ async def compile_tectonic_endpoint(req: TectonicCompileRequest = Body(...), cur
     """
     Compile LaTeX using Tectonic in short-lived container (on-demand).
     Accepts either tex_source OR template_name + patches.
-    Returns application/pdf streaming response on success.
+    Returns an application/pdf response on success.
     """
     if not req.tex_source and not req.template_name:
         raise HTTPException(status_code=400, detail="Provide tex_source or template_name")
@@ -29,23 +29,30 @@ async def compile_tectonic_endpoint(req: TectonicCompileRequest = Body(...), cur
     # load template if requested
     tex = req.tex_source
     if not tex and req.template_name:
-        from app.services.latex_compiler import TEMPLATES_DIR  # reuse templates dir
-        template_path = TEMPLATES_DIR / req.template_name
-        if not template_path.exists():
+        try:
+            tex = load_template(req.template_name)  # reuse templates dir
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="Template not found")
-        tex = template_path.read_text(encoding="utf-8")
-        if req.patches:
-            for k, v in req.patches.items():
-                tex = tex.replace(f"{{{{{k}}}}}", str(v))
+        tex = apply_patches(tex, req.patches)
 
-    timeout = req.timeout_sec or None
+    timeout = req.timeout_sec or DEFAULT_TIMEOUT
 
-    loop = asyncio.get_event_loop()
-    # run the blocking compile in a threadpool (calls docker)
-    success, pdf_bytes, log = await loop.run_in_executor(None, compile_tex_with_tectonic, tex, None, timeout)
+    # docker runs as an asyncio child process; the slot still caps concurrent compiles
+    try:
+        async with compile_slot():
+            success, pdf_path, log = await compile_tex_to_pdf_file(tex, DEFAULT_IMAGE, timeout)
+    except CompilerBusy:
+        raise HTTPException(status_code=429, detail="LaTeX compiler busy, retry later")
 
     if not success:
         raise HTTPException(status_code=500, detail={"compiled": False, "log": log})
 
-    # stream pdf bytes back
-    return StreamingResponse(io.BytesIO(pdf_bytes), media_type="application/pdf")
+    # stream the PDF from disk instead of loading it into memory; the work dir is
+    # removed once the response has been sent
+    return FileResponse(
+        pdf_path,
+        media_type="application/pdf",
+        filename="resume.pdf",
+        content_disposition_type="inline",
+        background=BackgroundTask(discard_pdf, pdf_path),
+    )
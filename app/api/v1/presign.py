@@ -1,14 +1,15 @@
 # app/api/v1/presign.py
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel
 from typing import Optional
+import os
 import uuid
 import asyncio
 from app.services.r2_presign import async_generate_presigned_put_url
 from app.core.config import settings
 from app.api.v1.auth import get_current_user
 from app.db.documents import Resume
-from app.services.queue import enqueue_stream_job
+from app.services.queue import enqueue_stream_job_safe
 
 router = APIRouter()
 
@@ -35,12 +36,9 @@ async def presign(req: PresignRequest, user = Depends(get_current_user)):
 
     # Construct a storage key that includes user id + uuid to avoid collisions
     uid = str(user.id) if user is not None else "anonymous"
-    ext = ""
-    if "." in req.filename:
-        ext = req.filename.split(".")[-1]
-    storage_key = f"{req.prefix.rstrip('/')}/{uid}/{uuid.uuid4().hex}"
-    if ext:
-        storage_key = f"{storage_key}.{ext}"
+    _, ext = os.path.splitext(req.filename or "")  # ext keeps its leading "."
+    prefix = (req.prefix or "uploads/").rstrip("/")
+    storage_key = f"{prefix}/{uid}/{uuid.uuid4().hex}{ext}"
 
     expires = 15 * 60  # 15 minutes
     upload_url = await async_generate_presigned_put_url(bucket, storage_key, expires_in=expires)
@@ -52,7 +50,7 @@ class ConfirmRequest(BaseModel):
     original_filename: Optional[str] = None
 
 @router.post("/confirm-upload")
-async def confirm_upload(req: ConfirmRequest, current_user = Depends(get_current_user)):
+async def confirm_upload(req: ConfirmRequest, background: BackgroundTasks, current_user = Depends(get_current_user)):
     """
     Client should call this endpoint AFTER successfully PUTing the file to the presigned URL.
     This will persist the Resume document and enqueue the pipeline job.
@@ -75,11 +73,8 @@ async def confirm_upload(req: ConfirmRequest, current_user = Depends(get_current
         "seed": 42
     }
 
-    # Use resume id as idempotency key
-    try:
-        await enqueue_stream_job(payload, idempotency_key=str(resume.id))
-    except Exception:
-        # best-effort enqueue; swallow failure but consider logging/monitoring
-        pass
+    # Use resume id as idempotency key; enqueue after the response is sent
+    # (best-effort, failures are logged by enqueue_stream_job_safe)
+    background.add_task(enqueue_stream_job_safe, payload, idempotency_key=str(resume.id))
 
     return {"resume_id": str(resume.id), "storage_key": req.storage_key}
@@ -1,6 +1,9 @@
 # app/api/v1/schemas.py
-from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, HttpUrl
+from typing import Annotated, Optional, Dict, Any
+
+# Beanie documents carry ObjectId ids; responses expose them as strings
+DocId = Annotated[str, BeforeValidator(str)]
 
 class JobCreate(BaseModel):
     source_url: Optional[HttpUrl] = None
@@ -8,24 +11,23 @@ class JobCreate(BaseModel):
     user_id: Optional[str] = None
 
 class JobResp(BaseModel):
-    id: str
+    model_config = ConfigDict(from_attributes=True)
+
+    id: DocId
     source_url: Optional[str]
     raw_text: Optional[str]
 
-    class Config:
-        orm_mode = True
-
 class ResumeCreate(BaseModel):
     user_id: Optional[str] = None
     original_filename: Optional[str] = None
     storage_key: Optional[str] = None
 
 class ResumeResp(BaseModel):
-    id: str
+    model_config = ConfigDict(from_attributes=True)
+
+    id: DocId
     original_filename: Optional[str]
     storage_key: Optional[str]
-    class Config:
-        orm_mode = True
 
 class AssessmentCreate(BaseModel):
     job_id: str
@@ -33,8 +35,8 @@ class AssessmentCreate(BaseModel):
     user_id: Optional[str] = None
 
 class AssessmentResp(BaseModel):
-    id: str
+    model_config = ConfigDict(from_attributes=True)
+
+    id: DocId
     score: Optional[float]
     results_json: Optional[Dict[str, Any]] = None
-    class Config:
-        orm_mode = True
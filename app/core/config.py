@@ -1,4 +1,5 @@
 # app/core/config.py
+from functools import lru_cache
 from typing import Optional
 from pydantic import AnyUrl
 from pydantic_settings import BaseSettings
@@ -7,12 +8,37 @@ class Settings(BaseSettings):
     # App
     APP_ENV: str = "development"
     SECRET_KEY: str = "change-me"  # override in .env / secrets
+    # HMAC key for stored token hashes; unset derives one from SECRET_KEY (never the JWT key itself)
+    TOKEN_HASH_PEPPER: Optional[str] = None
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
+    # approximate MAXLEN for the pipeline job stream and its dead-letter stream
+    PIPELINE_STREAM_MAXLEN: int = 100_000
+    PIPELINE_DLQ_MAXLEN: int = 10_000
+    # list-queue worker (app/services/worker.py): jobs popped per round-trip / run at once
+    WORKER_BATCH_SIZE: int = 16
+    WORKER_CONCURRENCY: int = 8
+    # most resumes one /assess_batch request may carry (larger bodies get 422)
+    ASSESS_BATCH_MAX: int = 100
 
     # MongoDB
     MONGODB_URI: Optional[str] = "mongodb://localhost:27017/ats_resume"
+    # Connection pool tuning (passed straight to AsyncMongoClient)
+    MONGO_MAX_POOL_SIZE: int = 200
+    MONGO_MIN_POOL_SIZE: int = 20
+    MONGO_MAX_IDLE_TIME_MS: int = 30_000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 10_000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 3_000
+    # e.g. "zstd,zlib" - only enable compressors the server (and client libs) support
+    MONGO_COMPRESSORS: Optional[str] = None
+
+    # SQLAlchemy pool (only used when DATABASE_URL is a SQL URL, see app/db/session.py)
+    SQL_POOL_SIZE: int = 20
+    SQL_MAX_OVERFLOW: int = 40
+    SQL_POOL_RECYCLE_SEC: int = 1800
+    # SELECT 1 on every checkout; enable only if the DB drops idle connections
+    SQL_POOL_PRE_PING: bool = False
 
     # S3 / R2
     S3_PROVIDER: str = "cloudflare"
@@ -36,17 +62,33 @@ class Settings(BaseSettings):
     LLM_TIMEOUT_SEC: int = 20
     LLM_RETRIES: int = 2
     LLM_BACKOFF_FACTOR: float = 0.5
+    # upper bound on a single (jittered, exponential) retry sleep
+    LLM_BACKOFF_CAP_SEC: float = 8.0
+    # consecutive failed calls before the HTTP adapter fails fast for LLM_BREAKER_COOLDOWN_SEC
+    LLM_BREAKER_THRESHOLD: int = 5
+    LLM_BREAKER_COOLDOWN_SEC: float = 30.0
     # allow fallback to mock adapter when HTTP adapter fails
     LLM_ALLOW_FALLBACK: bool = True
+    # Stage responses cached by digest of (stage, payload, seed); 0 disables the cache
+    LLM_CACHE_TTL_SEC: int = 86400
+
+    # Digest for cache keys (not security-relevant): "blake2b" (default, fast)
+    # or "sha256" to keep addressing entries written before the switch
+    CACHE_KEY_HASH: str = "blake2b"
 
     # other
     DETERMINISTIC_SEED: int = 42
+    # Dev/test only: serve auth + CRUD from process memory when Beanie is not
+    # initialised. Off by default so production never silently loses data.
+    USE_INMEM_FALLBACK: bool = False
     ALLOWED_HOSTS: str = "*"
     # Access token expiry (minutes) - environment values are often strings,
     # pydantic will coerce to int. Add this explicit field so env vars such as
     # ACCESS_TOKEN_EXPIRE_MINUTES or access_token_expire_minutes are accepted
     # instead of being treated as unexpected extras.
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # How long (seconds) a verified token -> user resolution is cached in-process
+    AUTH_TOKEN_CACHE_TTL_SEC: int = 30
 
     # Pydantic v2 settings: read from .env file
     model_config = {
@@ -54,5 +96,14 @@ class Settings(BaseSettings):
         "env_file_encoding": "utf-8",
     }
 
-# single shared settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build (once) and return the shared Settings; .env is parsed on first call."""
+    return Settings()
+
+def __getattr__(name: str):
+    # `from app.core.config import settings` (and config.settings) resolve here on first
+    # use, so nothing reads the environment / .env until a caller actually needs settings
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
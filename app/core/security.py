@@ -1,15 +1,45 @@
 # app/core/security.py
 from passlib.context import CryptContext
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
-from jose import jwt
+import jwt
+from cachetools import TTLCache
+import hashlib
+import hmac
+import threading
+import time
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# argon2id for new passwords (same parameters as app.services.auth); bcrypt
+# hashes still verify and are flagged deprecated so callers can upgrade them.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=1,
+)
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
+_EXP_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_SIGNING_KEY = settings.SECRET_KEY.encode("utf-8")
+
+def derive_key(label: bytes) -> bytes:
+    """
+    Key for one non-JWT use of the app secret (token hashes, verify-cache MACs):
+    HMAC-SHA256 of a per-use label, keyed by TOKEN_HASH_PEPPER when set, else SECRET_KEY.
+    Distinct labels give independent keys, none of them equal to the JWT signing key.
+    """
+    base = settings.TOKEN_HASH_PEPPER.encode("utf-8") if settings.TOKEN_HASH_PEPPER else _SIGNING_KEY
+    return hmac.new(base, label, hashlib.sha256).digest()
+
+_TOKEN_HASH_KEY = derive_key(b"ats-resume/token-hash/v1")
+
+# token digest -> decoded payload; skips re-verifying a token seen recently
+_decode_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_decode_lock = threading.RLock()
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -17,15 +47,35 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def hash_token(token: str) -> str:
+    """Digest for high-entropy secrets (session tokens, API keys).
+
+    These don't need a slow KDF: a keyed SHA-256 is enough and takes microseconds.
+    """
+    return hmac.new(_TOKEN_HASH_KEY, token.encode("utf-8"), hashlib.sha256).hexdigest()
+
+def verify_token_hash(token: str, token_hash: str) -> bool:
+    return hmac.compare_digest(hash_token(token), token_hash)
+
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode = {"sub": subject, "exp": expire}
-    encoded = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    ttl = int(expires_delta.total_seconds()) if expires_delta else _EXP_SECONDS
+    to_encode = {"sub": subject, "exp": int(time.time()) + ttl}
+    encoded = jwt.encode(to_encode, _SIGNING_KEY, algorithm=ALGORITHM)
     return encoded
 
 def decode_token(token: str) -> Optional[dict]:
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    with _decode_lock:
+        cached = _decode_cache.get(key)
+    if cached is not None and cached.get("exp", float("inf")) > time.time():
+        # a copy: callers mutating the claims must not corrupt later decodes
+        return dict(cached)
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        payload = jwt.decode(token, _SIGNING_KEY, algorithms=[ALGORITHM])
     except Exception:
+        with _decode_lock:
+            _decode_cache.pop(key, None)
         return None
+    with _decode_lock:
+        _decode_cache[key] = payload
+    return dict(payload)
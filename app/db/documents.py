@@ -5,12 +5,16 @@ used elsewhere; they exist so tests that initialize Beanie can run.
 """
 from typing import Optional, Any
 from beanie import Document
+from pymongo import IndexModel
 
 
 class User(Document):
     email: str
     password_hash: str
 
+    class Settings:
+        indexes = [IndexModel("email", unique=True)]
+
 
 class Resume(Document):
     user_id: Optional[str] = None
@@ -31,9 +35,16 @@ class Assessment(Document):
     score: Optional[float] = None
     results_json: Optional[dict[Any, Any]] = None
 
+    class Settings:
+        # per-user listing, newest first (ObjectId _id encodes creation time)
+        indexes = [IndexModel([("user_id", 1), ("_id", -1)])]
+
 
 class History(Document):
     item_id: Optional[str] = None
     action: Optional[str] = None
     timestamp: Optional[str] = None
 
+    class Settings:
+        indexes = [IndexModel([("item_id", 1), ("timestamp", -1)])]
+
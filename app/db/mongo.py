@@ -1,30 +1,48 @@
 # app/db/mongo.py
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
 from beanie import init_beanie
 from app.core.config import settings
 from app.db.documents import User, Resume, JobPosting, Assessment, History
 
-mongo_client: AsyncIOMotorClient | None = None
+# Native PyMongo async client (Beanie 2.x); no motor thread-hop per query
+mongo_client: AsyncMongoClient | None = None
+
+DEFAULT_DB_NAME = "ats_resume"
+
+def _client_options() -> dict:
+    opts = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    if settings.MONGO_COMPRESSORS:
+        opts["compressors"] = settings.MONGO_COMPRESSORS
+    return opts
 
 async def init_db():
     global mongo_client
     if mongo_client:
         return
-    mongo_client = AsyncIOMotorClient(settings.MONGODB_URI)
+    mongo_client = AsyncMongoClient(settings.MONGODB_URI, **_client_options())
+    # Connect before serving traffic so the pool starts filling towards
+    # minPoolSize now rather than on the first burst of requests.
+    await mongo_client.admin.command("ping")
     # Use the DB name from the URI or fall back to `ats_resume`
-    db = mongo_client.get_default_database() if mongo_client.get_default_database() else mongo_client["ats_resume"]
+    db = mongo_client.get_default_database(default=DEFAULT_DB_NAME)
     await init_beanie(database=db, document_models=[User, Resume, JobPosting, Assessment, History])
 
-def get_client() -> AsyncIOMotorClient | None:
+def get_client() -> AsyncMongoClient | None:
     return mongo_client
 
 def get_database():
     if mongo_client:
-        return mongo_client.get_default_database()
+        return mongo_client.get_default_database(default=DEFAULT_DB_NAME)
     return None
 
-def close_db():
+async def close_db():
     global mongo_client
     if mongo_client:
-        mongo_client.close()
+        await mongo_client.close()
         mongo_client = None
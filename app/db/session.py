@@ -30,9 +30,28 @@ if _is_sql_database(getattr(settings, "DATABASE_URL", None)):
     try:
         from sqlalchemy import create_engine
         from sqlalchemy.orm import sessionmaker
+        import orjson
+
+        def _json_dumps(obj) -> str:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
 
         SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-        engine = create_engine(SQLALCHEMY_DATABASE_URL, future=True, echo=False, pool_pre_ping=True)
+        pool_kwargs = {
+            "pool_recycle": settings.SQL_POOL_RECYCLE_SEC,
+            "pool_pre_ping": settings.SQL_POOL_PRE_PING,
+        }
+        # SQLite uses a singleton/null pool that rejects sizing arguments
+        if not SQLALCHEMY_DATABASE_URL.lower().startswith("sqlite"):
+            pool_kwargs.update(pool_size=settings.SQL_POOL_SIZE, max_overflow=settings.SQL_MAX_OVERFLOW)
+        # JSON columns (Assessment.results_json) go through orjson; drivers expect str
+        engine = create_engine(
+            SQLALCHEMY_DATABASE_URL,
+            future=True,
+            echo=False,
+            json_serializer=_json_dumps,
+            json_deserializer=orjson.loads,
+            **pool_kwargs,
+        )
         SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
         def get_db() -> Generator:
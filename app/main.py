@@ -1,14 +1,23 @@
 # app/main.py
+import asyncio
+from typing import Any, Set
+
+import orjson
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from app.api.v1.routes import router as api_router
 from app.api.v1.pipeline_routes import router as pipeline_router
 # app/main.py (snippet)
 from app.api.v1.auth import router as auth_router
-from app.api.v1.uploads import router as uploads_router
 from app.api.v1.presign import router as presign_router
+from app.services.llm_adapter import aclose as close_llm_adapter
+from app.services.r2_fetch import aclose as close_r2_fetch
+from app.services.latex_compiler import wait_for_cleanups
+from app.services.latex_tectonic_runner import WARMUP as TEX_WARMUP, warm_up_tectonic
+from app.services.pipeline import shutdown_resume_pool
 
 
-# Try to import MongoDB init/close helpers. If motor/pymongo are not
+# Try to import MongoDB init/close helpers. If pymongo/beanie are not
 # available or incompatible, fall back to no-op implementations so the
 # app can still start for development or testing without Mongo.
 try:
@@ -17,28 +26,47 @@ except Exception:
     async def init_db():
         return None
 
-    def close_db():
+    async def close_db():
         return None
 
 
-app = FastAPI(title="ATS Resume API")
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (C encoder) instead of stdlib json."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
 
-# Register routers after `app` is created. Include pipeline routes first
-# so the pipeline `/assess` endpoint is the active handler when paths collide.
+app = FastAPI(title="ATS Resume API", default_response_class=ORJSONResponse)
+
+# Register routers after `app` is created. Each method+path must be owned by
+# exactly one router (tests/test_api.py checks for duplicate operations).
 app.include_router(pipeline_router, prefix="/api/v1")
 app.include_router(api_router, prefix="/api/v1")
-# Attach auth and uploads routers under the API prefix
 # Mount auth routes at the root `/auth` paths used by tests
 app.include_router(auth_router)
-app.include_router(uploads_router, prefix="/api/v1")
 app.include_router(presign_router, prefix="/api/v1")
 
 
+# strong refs to fire-and-forget startup tasks
+_background_tasks: Set[asyncio.Task] = set()
+
+
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    if TEX_WARMUP:
+        # in the background: startup isn't held up by an image pull or first compile
+        task = asyncio.create_task(asyncio.to_thread(warm_up_tectonic))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    close_db()
+    await close_llm_adapter()
+    await close_r2_fetch()
+    shutdown_resume_pool()
+    await close_db()
+    # let pending compile work-dir deletions finish
+    await asyncio.to_thread(wait_for_cleanups, 10)
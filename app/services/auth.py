@@ -1,52 +1,146 @@
 # app/services/auth.py
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
+import asyncio
+import concurrent.futures
 import hashlib
-import secrets
-from jose import jwt, JWTError
+import hmac
+import os
+import threading
+import time
+from argon2 import PasswordHasher
+from cachetools import LRUCache, TTLCache
+from argon2.exceptions import InvalidHashError, VerificationError
+import jwt
+from jwt import PyJWTError as JWTError
 from pydantic import BaseModel
 from app.core.config import settings
+from app.core.security import derive_key
 
- # Password hashing using PBKDF2-HMAC-SHA256 (avoids bcrypt backend issues)
-_PBKDF2_ITERATIONS = 100_000
+# Password hashing: argon2id. Legacy PBKDF2-HMAC-SHA256 hashes still verify.
+_PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+_PBKDF2_PREFIX = "pbkdf2_sha256$"
+
+# (hash, mac(plain)) pairs already verified in this process
+_VERIFY_CACHE: LRUCache = LRUCache(maxsize=2048)
+_VERIFY_LOCK = threading.Lock()
+# keyed once; each verify copies this instead of re-running the HMAC key setup.
+# Its own derived key, never the JWT signing key.
+_VERIFY_MAC = hmac.new(derive_key(b"ats-resume/verify-cache/v1"), digestmod=hashlib.sha256)
+
+# argon2 (cffi) and hashlib both release the GIL, so threads parallelise the
+# hashing without the pickling/spawn cost of a process pool.
+_pwd_pool = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="pwd")
 
 # JWT config
 SECRET_KEY = getattr(settings, "SECRET_KEY", "change-me")
 ALGORITHM = "HS256"
+# encoded once at import instead of on every encode/decode
+_SIGNING_KEY = SECRET_KEY.encode("utf-8")
+_ALGORITHMS = [ALGORITHM]
 ACCESS_TOKEN_EXPIRE_MINUTES = int(getattr(settings, "ACCESS_TOKEN_EXPIRE_MINUTES", 60))
+_EXP_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+# Verified tokens -> decoded claims. The same bearer token arrives on many
+# consecutive requests, so skip re-verifying the HMAC signature each time.
+_DECODE_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_DECODE_LOCK = threading.RLock()
+
+def token_digest(token: str) -> bytes:
+    """Short fixed-size cache key for a bearer token."""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
 
 class TokenData(BaseModel):
     sub: Optional[str] = None
+    exp: Optional[int] = None
 
 def hash_password(password: str) -> str:
     if password is None:
         password = ""
-    salt = secrets.token_hex(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), _PBKDF2_ITERATIONS)
-    return f"pbkdf2_sha256${_PBKDF2_ITERATIONS}${salt}${dk.hex()}"
+    return _PASSWORD_HASHER.hash(password)
 
 
-def verify_password(plain: str, hashed: str) -> bool:
-    if plain is None:
-        plain = ""
+def _verify_pbkdf2(plain: bytes, hashed: str) -> bool:
+    # hashlib.pbkdf2_hmac is OpenSSL's PKCS5_PBKDF2_HMAC, which already picks up
+    # the SHA-NI / ARMv8 SHA2 instructions; compare raw digests, not hex strings.
     try:
         scheme, iterations, salt, hashhex = hashed.split("$")
         iterations = int(iterations)
+        expected = bytes.fromhex(hashhex)
     except Exception:
         return False
-    dk = hashlib.pbkdf2_hmac("sha256", plain.encode("utf-8"), salt.encode("utf-8"), iterations)
-    return secrets.compare_digest(dk.hex(), hashhex)
+    dk = hashlib.pbkdf2_hmac("sha256", plain, salt.encode("utf-8"), iterations, dklen=len(expected) or None)
+    return hmac.compare_digest(dk, expected)
+
+
+def _verify_uncached(plain: bytes, hashed: str) -> bool:
+    if hashed.startswith(_PBKDF2_PREFIX):
+        return _verify_pbkdf2(plain, hashed)
+    try:
+        return _PASSWORD_HASHER.verify(hashed, plain)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    if plain is None:
+        plain = ""
+    if not hashed:
+        return False
+    # Encode once; the cache key, PBKDF2 and argon2 all take the same bytes.
+    plain_bytes = plain.encode("utf-8")
+    # Key on a keyed MAC of the plaintext so cleartext never sits in the cache.
+    # Only successful checks are remembered; a wrong guess always pays the KDF.
+    mac = _VERIFY_MAC.copy()
+    mac.update(plain_bytes)
+    key = (hashed, mac.digest())
+    with _VERIFY_LOCK:
+        if key in _VERIFY_CACHE:
+            return True
+    ok = _verify_uncached(plain_bytes, hashed)
+    if ok:
+        with _VERIFY_LOCK:
+            _VERIFY_CACHE[key] = True
+    return ok
+
+def password_needs_rehash(hashed: str) -> bool:
+    """True for legacy PBKDF2 hashes and argon2 hashes made with older parameters."""
+    if not hashed or hashed.startswith(_PBKDF2_PREFIX):
+        return True
+    try:
+        return _PASSWORD_HASHER.check_needs_rehash(hashed)
+    except InvalidHashError:
+        return True
+
+# Async wrappers for FastAPI usage (run the CPU-bound hashing off the event loop)
+async def async_hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pwd_pool, hash_password, password)
+
+async def async_verify_password(plain: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pwd_pool, verify_password, plain, hashed)
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
-    now = datetime.utcnow()
-    exp = now + (expires_delta if expires_delta else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    payload = {"sub": subject, "iat": now, "exp": exp}
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    now = int(time.time())
+    ttl = int(expires_delta.total_seconds()) if expires_delta else _EXP_SECONDS
+    payload = {"sub": subject, "iat": now, "exp": now + ttl}
+    return jwt.encode(payload, _SIGNING_KEY, algorithm=ALGORITHM)
 
 def decode_access_token(token: str) -> TokenData:
+    key = token_digest(token)
+    with _DECODE_LOCK:
+        cached = _DECODE_CACHE.get(key)
+    if cached is not None and (cached.exp is None or cached.exp > time.time()):
+        return cached
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _SIGNING_KEY, algorithms=_ALGORITHMS)
         sub = payload.get("sub")
-        return TokenData(sub=sub)
+        td = TokenData(sub=sub, exp=payload.get("exp"))
     except JWTError as exc:
+        with _DECODE_LOCK:
+            _DECODE_CACHE.pop(key, None)
         raise exc
+    with _DECODE_LOCK:
+        _DECODE_CACHE[key] = td
+    return td
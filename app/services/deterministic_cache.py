@@ -1,7 +1,7 @@
 # app/services/deterministic_cache.py
-import json
 import asyncio
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, Mapping, Optional
+import orjson
 from app.core.config import settings
 
 try:
@@ -10,6 +10,10 @@ except Exception:
     aioredis = None  # tests can monkeypatch or skip Redis if not available
 
 DEFAULT_TTL = 60 * 60 * 24  # 24h
+MAX_CONNECTIONS = 64
+
+# json.dumps stringifies int keys; keep that behaviour for cached stage outputs
+_DUMPS_OPTS = orjson.OPT_NON_STR_KEYS
 
 class DeterministicCache:
     def __init__(self, url: Optional[str] = None):
@@ -20,7 +24,13 @@ class DeterministicCache:
         if self._client is None:
             if aioredis is None:
                 raise RuntimeError("redis.asyncio is not installed")
-            self._client = aioredis.from_url(self._url, decode_responses=True)
+            # raw bytes in/out: orjson produces and parses bytes directly
+            self._client = aioredis.from_url(
+                self._url,
+                max_connections=MAX_CONNECTIONS,
+                decode_responses=False,
+                socket_keepalive=True,
+            )
         return self._client
 
     async def get(self, key: str) -> Optional[Any]:
@@ -28,11 +38,30 @@ class DeterministicCache:
         val = await client.get(key)
         if val is None:
             return None
-        return json.loads(val)
+        return orjson.loads(val)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Fetch several keys in one round-trip (MGET); missing keys are left out."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        client = await self._get_client()
+        values = await client.mget(keys)
+        return {key: orjson.loads(val) for key, val in zip(keys, values) if val is not None}
 
     async def set(self, key: str, value: Any, ttl: int = DEFAULT_TTL):
         client = await self._get_client()
-        await client.set(key, json.dumps(value), ex=ttl)
+        await client.set(key, orjson.dumps(value, option=_DUMPS_OPTS), ex=ttl)
+
+    async def set_many(self, items: Mapping[str, Any], ttl: int = DEFAULT_TTL):
+        """Write several keys in one round-trip (non-transactional pipeline)."""
+        if not items:
+            return
+        client = await self._get_client()
+        async with client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, orjson.dumps(value, option=_DUMPS_OPTS), ex=ttl)
+            await pipe.execute()
 
     async def delete(self, key: str):
         client = await self._get_client()
@@ -1,10 +1,16 @@
 # app/services/latex_compiler.py
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import re
 import tempfile
 import pathlib
 import shutil
 import subprocess
 import os
-from typing import Tuple, Optional
+import threading
+from typing import Any, AsyncIterator, Callable, List, Set, Tuple, Optional
 import uuid
 import logging
 
@@ -18,33 +24,223 @@ TEMPLATES_DIR = BASE_DIR / "templates" / "latex"
 DEFAULT_TIMEOUT = int(os.getenv("LATEX_COMPILE_TIMEOUT", "20"))
 # Max PDF size to return (bytes)
 MAX_PDF_BYTES = int(os.getenv("LATEX_MAX_PDF_BYTES", str(10 * 1024 * 1024)))  # 10MB
+# Optional precompiled pdflatex format (e.g. built once with mylatexformat from the
+# shared template preamble). With it pdflatex loads the dumped preamble instead of
+# re-parsing the class and packages on every compile.
+LATEX_FORMAT = os.getenv("LATEX_FORMAT") or None
+# Build logs are written to the work dir; only this much of the end is read back
+LOG_TAIL_BYTES = int(os.getenv("LATEX_LOG_TAIL_BYTES", "4096"))
+# Max compiles (latexmk or tectonic) running at once; extra requests are rejected
+MAX_CONCURRENT_COMPILES = int(os.getenv("LATEX_MAX_CONCURRENT", "8"))
+
+# Dedicated pool so slow compiles never starve the default executor used by
+# storage, Mongo and password hashing. Compiles spend their time waiting on a
+# child process, so threads are enough to run them in parallel.
+_compile_pool = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_COMPILES, thread_name_prefix="latex")
+_compile_slots = asyncio.Semaphore(MAX_CONCURRENT_COMPILES)
+# Work dirs are deleted here after the result is returned, off the request's path
+_cleanup_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="latex-cleanup")
+_pending_cleanups: Set[concurrent.futures.Future] = set()
+_cleanup_lock = threading.Lock()
+
+
+class CompilerBusy(RuntimeError):
+    """Raised when every compile slot is taken."""
+
+
+@contextlib.asynccontextmanager
+async def compile_slot() -> AsyncIterator[None]:
+    """
+    Hold one of the MAX_CONCURRENT_COMPILES slots for the duration of the block.
+    Raises CompilerBusy instead of queueing when all slots are in use.
+    """
+    if _compile_slots.locked():
+        raise CompilerBusy("all LaTeX compile slots are busy")
+    async with _compile_slots:
+        yield
+
+
+async def run_compile(func: Callable[..., Tuple[bool, bytes, str]], *args: Any) -> Tuple[bool, bytes, str]:
+    """
+    Run a blocking compile function on the dedicated compile pool.
+    Raises CompilerBusy instead of queueing when all slots are in use.
+    """
+    async with compile_slot():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_compile_pool, func, *args)
+
+
+async def run_subprocess(
+    argv: List[str], timeout: float, cwd: Optional[str] = None, log_path: Optional[pathlib.Path] = None
+) -> Tuple[int, bytes]:
+    """
+    Run argv as a child process without tying up a thread; returns (returncode, stdout+stderr).
+    With log_path the output goes straight to that file instead and b"" is returned;
+    read what's needed with read_log_tail().
+    On timeout the child is killed and asyncio.TimeoutError is raised.
+    """
+    log_f = open(log_path, "wb") if log_path is not None else None
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *argv, cwd=cwd, stdout=log_f if log_f is not None else asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+    finally:
+        # the child holds its own copy of the descriptor
+        if log_f is not None:
+            log_f.close()
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, out or b""
+
+
+def read_log_tail(path: pathlib.Path, limit: int = LOG_TAIL_BYTES) -> str:
+    """Decode only the last `limit` bytes of a build log (the part with the error)."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - limit))
+            return f.read().decode("utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+def remove_workdir_later(path: pathlib.Path) -> None:
+    """Delete a compile work dir on a background thread; the caller does not wait for it."""
+    fut = _cleanup_pool.submit(shutil.rmtree, path, True)
+    with _cleanup_lock:
+        _pending_cleanups.add(fut)
+    fut.add_done_callback(_cleanup_done)
+
+
+def _cleanup_done(fut: concurrent.futures.Future) -> None:
+    with _cleanup_lock:
+        _pending_cleanups.discard(fut)
+
+
+def wait_for_cleanups(timeout: Optional[float] = None) -> None:
+    """Block until scheduled work-dir deletions finish (for shutdown and tests)."""
+    with _cleanup_lock:
+        pending = list(_pending_cleanups)
+    concurrent.futures.wait(pending, timeout=timeout)
+
+# $PATH lookups are resolved once per process, not on every compile.
+# Prefer discovered binaries, but if which() returns None still try the binary name.
+@functools.lru_cache(maxsize=1)
+def _latexmk_bin() -> str:
+    return shutil.which("latexmk") or "latexmk"
+
+@functools.lru_cache(maxsize=1)
+def _pdflatex_bin() -> str:
+    return shutil.which("pdflatex") or "pdflatex"
+
+# shared by the tectonic runner and its container pool; a bare "docker" keeps the
+# FileNotFoundError path when it isn't installed
+DOCKER_BIN = shutil.which("docker") or "docker"
 
 def _sanitize_filename(name: str) -> str:
     # Basic sanitize: allow alnum, underscore, dash, dot
     return "".join([c for c in name if c.isalnum() or c in ("_", "-", ".")]).strip() or "resume"
 
+@functools.lru_cache(maxsize=64)
+def _load_template_cached(path_str: str, mtime_ns: int) -> str:
+    return pathlib.Path(path_str).read_text(encoding="utf-8")
+
+def load_template(name: str) -> str:
+    """
+    Return the text of TEMPLATES_DIR/name, read from disk only when the file's
+    mtime changes. Raises FileNotFoundError if the template does not exist.
+    """
+    path = TEMPLATES_DIR / name
+    return _load_template_cached(str(path), path.stat().st_mtime_ns)
+
+@functools.lru_cache(maxsize=128)
+def _patch_pattern(keys: Tuple[str, ...]) -> "re.Pattern[str]":
+    return re.compile(r"\{\{(" + "|".join(re.escape(k) for k in keys) + r")\}\}")
+
+def apply_patches(tex: str, patches: Optional[dict]) -> str:
+    """
+    Replace {{key}} placeholders in tex with str(value) in a single regex pass.
+    The compiled pattern is cached per key set, since templates are patched
+    with the same keys over and over.
+    """
+    if not patches:
+        return tex
+    values = {str(k): str(v) for k, v in patches.items()}
+    pattern = _patch_pattern(tuple(sorted(values)))
+    return pattern.sub(lambda m: values[m.group(1)], tex)
+
+# below this much free space a tmpfs is skipped in favour of the disk-backed temp dir
+# (container /dev/shm defaults to 64 MB)
+_MIN_SCRATCH_FREE = 256 * 1024 * 1024
+
+def _scratch_usable(root: str) -> bool:
+    try:
+        return os.access(root, os.W_OK) and shutil.disk_usage(root).free >= _MIN_SCRATCH_FREE
+    except OSError:
+        return False
+
+@functools.lru_cache(maxsize=1)
+def _default_workdir_root() -> Optional[str]:
+    """
+    Compile in RAM (/dev/shm) when it is available, writable and has room, so the
+    .tex, aux files and PDF never touch disk. None means tempfile's default dir.
+    """
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and _scratch_usable(shm):
+        return shm
+    return None
+
+class _PdfTooLarge(Exception):
+    def __init__(self, size: int):
+        super().__init__(size)
+        self.size = size
+
+def _read_pdf(path: pathlib.Path) -> bytes:
+    """Read the compiled PDF with one sized read; refuse oversize files before reading them."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if size > MAX_PDF_BYTES:
+            raise _PdfTooLarge(size)
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
 def compile_latex(tex_source: str, workdir_root: Optional[str] = None, timeout: int = DEFAULT_TIMEOUT) -> Tuple[bool, bytes, str]:
     """
     Compiles tex_source to PDF using latexmk (fallback to pdflatex).
     Returns (success, pdf_bytes_or_empty, log_text).
     This function is blocking and should be run in a worker thread if called from async code.
     """
-    work_root = pathlib.Path(workdir_root) if workdir_root else None
-    tmpdir = tempfile.mkdtemp(prefix="latex_compile_", dir=str(work_root) if work_root else None)
+    tmpdir = tempfile.mkdtemp(prefix="latex_compile_", dir=workdir_root or _default_workdir_root())
     tmpdir_path = pathlib.Path(tmpdir)
     try:
         main_tex_name = f"{_sanitize_filename('resume')}.tex"
         tex_path = tmpdir_path / main_tex_name
-        tex_path.write_text(tex_source, encoding="utf-8")
+        tex_path.write_bytes(tex_source.encode("utf-8"))
 
         # run latexmk if available, else fallback to pdflatex twice
         # latexmk flags: -pdf (produce pdf), -interaction=nonstopmode, -halt-on-error
         # Do not enable -shell-escape to avoid executing shell commands.
-        # prefer discovered binaries, but if which() returns None still try the binary name
-        latexmk_cmd = shutil.which("latexmk") or "latexmk"
-        pdflatex = shutil.which("pdflatex") or "pdflatex"
+        latexmk_cmd = _latexmk_bin()
+        pdflatex = _pdflatex_bin()
         # try latexmk first
+        fmt_args = [f"-fmt={LATEX_FORMAT}"] if LATEX_FORMAT else []
         cmd = [latexmk_cmd, "-pdf", "-interaction=nonstopmode", "-halt-on-error", main_tex_name]
+        if LATEX_FORMAT:
+            cmd.insert(2, f"-pdflatex={pdflatex} -fmt={LATEX_FORMAT} %O %S")
 
         logger.info("Starting LaTeX compile: %s", cmd)
         try:
@@ -61,7 +257,7 @@ def compile_latex(tex_source: str, workdir_root: Optional[str] = None, timeout:
             # if latexmk was not available or returned non-zero, try pdflatex fallback
             if final_returncode != 0 and pdflatex:
                 proc2 = subprocess.run(
-                    [pdflatex, "-interaction=nonstopmode", "-halt-on-error", main_tex_name],
+                    [pdflatex, *fmt_args, "-interaction=nonstopmode", "-halt-on-error", main_tex_name],
                     cwd=str(tmpdir_path),
                     stdout=subprocess.PIPE,
                     stderr=subprocess.STDOUT,
@@ -80,14 +276,14 @@ def compile_latex(tex_source: str, workdir_root: Optional[str] = None, timeout:
 
         pdf_path = tmpdir_path / (main_tex_name.replace(".tex", ".pdf"))
         try:
-            pdf_bytes = pdf_path.read_bytes()
+            pdf_bytes = _read_pdf(pdf_path)
         except FileNotFoundError:
             logger.warning("LaTeX compile failed (returncode=%s) - PDF missing", final_returncode)
             return False, b"", log
-        if len(pdf_bytes) > MAX_PDF_BYTES:
-            logger.warning("Compiled PDF exceeds max size (%s bytes)", len(pdf_bytes))
+        except _PdfTooLarge as exc:
+            logger.warning("Compiled PDF exceeds max size (%s bytes)", exc.size)
             # do not return huge files
-            return False, b"", log + f"\n\nCompiled PDF too large: {len(pdf_bytes)} bytes"
+            return False, b"", log + f"\n\nCompiled PDF too large: {exc.size} bytes"
 
         return True, pdf_bytes, log
 
@@ -98,8 +294,4 @@ def compile_latex(tex_source: str, workdir_root: Optional[str] = None, timeout:
         logger.exception("Unexpected error during LaTeX compile")
         return False, b"", f"Error: {str(exc)}"
     finally:
-        # cleanup
-        try:
-            shutil.rmtree(tmpdir_path)
-        except Exception:
-            pass
+        remove_workdir_later(tmpdir_path)
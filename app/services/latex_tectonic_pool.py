@@ -0,0 +1,212 @@
+# app/services/latex_tectonic_pool.py
+"""
+Warm Tectonic container shared by all compiles.
+
+`docker run --rm` per compile pays container create/start/teardown every time.
+Instead one detached container (`sleep infinity`) is kept running with a scratch
+directory bind-mounted at /data, and each compile is a `docker exec` into it
+working in its own /data/<uuid> subdirectory. The scratch directory lives on tmpfs
+(TEX_TMP, else /dev/shm) when usable, so compiles write to RAM rather than disk.
+
+API:
+- compile_in_pool(tex_source, image, timeout) -> (success, pdf_bytes, log), or None
+  when the pool container can't be used (caller falls back to `docker run --rm`).
+- compile_in_pool_async(...) -> same, awaiting the docker exec instead of blocking a thread.
+- compile_in_pool_to_file(...) -> (success, pdf_path, log) with the PDF left on disk.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import pathlib
+import subprocess
+import tempfile
+import threading
+import uuid
+from typing import List, Optional, Tuple
+from app.services.latex_compiler import DOCKER_BIN, _default_workdir_root, _scratch_usable, read_log_tail, remove_workdir_later, run_subprocess
+
+logger = logging.getLogger(__name__)
+
+
+def _scratch_root() -> Optional[str]:
+    """TEX_TMP, else /dev/shm if usable, for tectonic work dirs; None means tempfile's default."""
+    root = os.getenv("TEX_TMP") or _default_workdir_root()
+    if root is None:
+        return None
+    if _scratch_usable(root):
+        return root
+    logger.warning("tectonic scratch %s unusable or low on space; using %s", root, tempfile.gettempdir())
+    return None
+
+
+# checked once at import; aux/log/pdf writes of every compile land here
+TEX_SCRATCH_ROOT = _scratch_root()
+
+POOL_CONTAINER = os.getenv("TEX_POOL_CONTAINER", "tectonic-pool")
+SCRATCH_DIR = pathlib.Path(os.getenv("TEX_POOL_SCRATCH") or os.path.join(TEX_SCRATCH_ROOT or tempfile.gettempdir(), "tectonic-pool"))
+
+# docker CLI exit codes meaning "docker itself failed", not tectonic:
+# 125 daemon/container error, 126 command not executable, 127 command not found
+_DOCKER_ERROR_CODES = (125, 126, 127)
+
+_lock = threading.Lock()
+_running_image: Optional[str] = None
+_docker_missing = False
+_cleanup_registered = False
+
+
+def _remove_container() -> None:
+    try:
+        subprocess.run([DOCKER_BIN, "rm", "-f", POOL_CONTAINER], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10, check=False)
+    except Exception:
+        pass
+
+
+def _ensure_container(image: str) -> bool:
+    """Start the pool container if it isn't running. Returns False if it can't be started."""
+    global _running_image, _docker_missing, _cleanup_registered
+    with _lock:
+        if _docker_missing:
+            return False
+        if _running_image == image:
+            return True
+        try:
+            SCRATCH_DIR.mkdir(parents=True, exist_ok=True)
+            inspect = subprocess.run(
+                [DOCKER_BIN, "inspect", "-f", "{{.State.Running}} {{.Config.Image}}", POOL_CONTAINER],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=10, check=False,
+            )
+            if inspect.returncode == 0 and inspect.stdout.decode().split() == ["true", image]:
+                _running_image = image
+                return True
+            # stopped, or started from another image: replace it
+            _remove_container()
+            start = subprocess.run(
+                [
+                    DOCKER_BIN, "run", "-d",
+                    "--name", POOL_CONTAINER,
+                    "--network", "none",
+                    "-v", f"{SCRATCH_DIR}:/data:Z",
+                    image,
+                    "sleep", "infinity",
+                ],
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=60, check=False,
+            )
+        except FileNotFoundError:
+            logger.warning("docker not found; tectonic container pool disabled")
+            _docker_missing = True
+            return False
+        except subprocess.TimeoutExpired:
+            logger.warning("timed out starting tectonic pool container")
+            return False
+        if start.returncode != 0:
+            logger.warning("could not start tectonic pool container: %s", start.stdout.decode("utf-8", errors="replace").strip())
+            return False
+        if not _cleanup_registered:
+            atexit.register(_remove_container)
+            _cleanup_registered = True
+        _running_image = image
+        return True
+
+
+def _mark_stale() -> None:
+    global _running_image
+    with _lock:
+        _running_image = None
+
+
+def _new_job(tex_source: str) -> Tuple[str, pathlib.Path, List[str]]:
+    job = uuid.uuid4().hex
+    jobdir = SCRATCH_DIR / job
+    jobdir.mkdir()
+    (jobdir / "resume.tex").write_bytes(tex_source.encode("utf-8"))
+    argv = [DOCKER_BIN, "exec", POOL_CONTAINER, "tectonic", f"/data/{job}/resume.tex", "--outdir", f"/data/{job}"]
+    return job, jobdir, argv
+
+
+def _docker_failed(returncode: int, out: str) -> bool:
+    if returncode in _DOCKER_ERROR_CODES or out.startswith("Error response from daemon"):
+        # container vanished or is broken: forget it and let the caller fall back
+        logger.warning("docker exec into tectonic pool failed (%s): %s", returncode, out.strip())
+        _mark_stale()
+        return True
+    return False
+
+
+def _collect(jobdir: pathlib.Path, returncode: int) -> Optional[Tuple[bool, bytes, str]]:
+    pdf_path = jobdir / "resume.pdf"
+    if returncode != 0 or not pdf_path.exists():
+        out = read_log_tail(jobdir / "tectonic.log")
+        if _docker_failed(returncode, out):
+            return None
+        return False, b"", out
+    return True, pdf_path.read_bytes(), ""
+
+
+def compile_in_pool(tex_source: str, image: str, timeout: int) -> Optional[Tuple[bool, bytes, str]]:
+    """
+    Blocking call. Compile tex_source inside the warm container.
+    Returns None (nothing compiled) if the container is unavailable.
+    """
+    if not _ensure_container(image):
+        return None
+    jobdir = None
+    try:
+        _, jobdir, argv = _new_job(tex_source)
+        # build output goes to a file in the job dir; only its tail is read, on failure
+        with open(jobdir / "tectonic.log", "wb") as log_f:
+            proc = subprocess.run(argv, stdout=log_f, stderr=subprocess.STDOUT, timeout=timeout, check=False)
+        return _collect(jobdir, proc.returncode)
+    except subprocess.TimeoutExpired as te:
+        return False, b"", f"Timeout after {timeout}s: {str(te)}"
+    except Exception as exc:
+        return False, b"", f"Error: {str(exc)}"
+    finally:
+        if jobdir is not None:
+            remove_workdir_later(jobdir)
+
+
+async def compile_in_pool_to_file(tex_source: str, image: str, timeout: int) -> Optional[Tuple[bool, Optional[pathlib.Path], str]]:
+    """
+    Like compile_in_pool_async, but leaves the PDF on disk and returns
+    (success, pdf_path, log). On success the caller owns pdf_path.parent and
+    must remove it. Returns None if the container is unavailable.
+    """
+    if _running_image != image and not await asyncio.to_thread(_ensure_container, image):
+        return None
+    jobdir = None
+    keep = False
+    try:
+        _, jobdir, argv = _new_job(tex_source)
+        returncode, _ = await run_subprocess(argv, timeout, log_path=jobdir / "tectonic.log")
+        pdf_path = jobdir / "resume.pdf"
+        if returncode != 0 or not pdf_path.exists():
+            out = read_log_tail(jobdir / "tectonic.log")
+            if _docker_failed(returncode, out):
+                return None
+            return False, None, out
+        keep = True
+        return True, pdf_path, ""
+    except asyncio.TimeoutError:
+        return False, None, f"Timeout after {timeout}s"
+    except Exception as exc:
+        return False, None, f"Error: {str(exc)}"
+    finally:
+        if jobdir is not None and not keep:
+            remove_workdir_later(jobdir)
+
+
+async def compile_in_pool_async(tex_source: str, image: str, timeout: int) -> Optional[Tuple[bool, bytes, str]]:
+    """Async variant of compile_in_pool: the docker exec runs as an asyncio child process."""
+    result = await compile_in_pool_to_file(tex_source, image, timeout)
+    if result is None:
+        return None
+    success, pdf_path, log = result
+    if not success:
+        return False, b"", log
+    try:
+        return True, pdf_path.read_bytes(), log
+    finally:
+        remove_workdir_later(pdf_path.parent)
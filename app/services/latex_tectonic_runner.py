@@ -5,29 +5,113 @@ This keeps the LaTeX runtime isolated in the container and avoids installing TeX
 
 API:
 - compile_tex_with_tectonic(tex_source: str, timeout: int = 30, image: str = "latex-tectonic:latest") -> (success: bool, pdf_bytes: bytes, log: str)
+- compile_tex_with_tectonic_async(...) -> same, as a coroutine (asyncio subprocess, no worker thread)
+- compile_tex_to_pdf_file(...) -> (success, pdf_path, log); PDF stays on disk for FileResponse,
+  release with discard_pdf(pdf_path)
+- warm_up_tectonic(...) -> bool; pulls the image if absent and runs a stub compile so the
+  first real request doesn't pay for container start and bundle/font cache population
 
 Implementation details:
-- creates a temporary directory
+- at most TEX_MAX_PARALLEL (default: CPU count) compiles run at once per process
+  (per sync/async path); the rest wait for a slot
+- with TEX_USE_HOST_BIN=1 and tectonic on PATH, Docker is skipped and tectonic runs
+  directly (under `unshare --user --map-root-user --net` when TEX_HOST_UNSHARE=1)
+- otherwise, by default compiles with `docker exec` into a warm pool container (see
+  latex_tectonic_pool); the steps below are the fallback when that is unavailable
+  or TEX_USE_POOL=0
+- creates a temporary directory (on tmpfs when possible: TEX_TMP, else /dev/shm)
 - writes resume.tex
 - runs `docker run --rm -v <tempdir>:/data latex-tectonic tectonic /data/resume.tex --outdir /data`
 - reads /data/resume.pdf and returns bytes
+- build output goes to <tempdir>/tectonic.log; only its last LATEX_LOG_TAIL_BYTES are
+  returned, and only on failure (log is "" on success)
 - cleans up tempdir
 """
 
+import asyncio
+import contextlib
+import functools
+import logging
+import threading
+import time
 import tempfile
 import pathlib
 import subprocess
 import shutil
 import os
 import uuid
-from typing import Tuple, Optional
+from typing import AsyncIterator, Iterator, List, Tuple, Optional
+from app.services.latex_compiler import DOCKER_BIN, read_log_tail, remove_workdir_later, run_subprocess
+from app.services.latex_tectonic_pool import TEX_SCRATCH_ROOT, compile_in_pool, compile_in_pool_to_file
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_IMAGE = os.getenv("TEX_IMAGE", "latex-tectonic:latest")
 DEFAULT_TIMEOUT = int(os.getenv("TEX_DOCKER_TIMEOUT", "30"))  # seconds
+# reuse a long-lived container instead of `docker run --rm` per compile
+USE_POOL = os.getenv("TEX_USE_POOL", "1") not in ("0", "false", "False")
+# skip Docker and run a host-installed tectonic directly (opt-in)
+USE_HOST_BIN = os.getenv("TEX_USE_HOST_BIN", "0") in ("1", "true", "True")
+# isolate the host tectonic in fresh user + network namespaces
+HOST_UNSHARE = os.getenv("TEX_HOST_UNSHARE", "0") in ("1", "true", "True")
+
+_DOCKER_RUN_PREFIX = (DOCKER_BIN, "run", "--rm", "--network", "none")  # no network for extra safety
+_UNSHARE_PREFIX = ("unshare", "--user", "--map-root-user", "--net")
+
+# tectonic processes (docker exec/run or host) in flight at once; extra calls wait.
+# Bounds CPU/RAM and keeps bursts from queueing up inside dockerd.
+MAX_PARALLEL = int(os.getenv("TEX_MAX_PARALLEL", str(os.cpu_count() or 4)))
+_sync_slots = threading.BoundedSemaphore(MAX_PARALLEL)
+_async_slots = asyncio.Semaphore(MAX_PARALLEL)
+# waits longer than this are logged, as a hint that TEX_MAX_PARALLEL is undersized
+_SLOW_WAIT_SEC = 0.5
+
+# warm the container and tectonic caches at app startup (set to 0 in dev without docker)
+WARMUP = os.getenv("TEX_WARMUP", "1") not in ("0", "false", "False")
+_WARMUP_TEX = r"\documentclass{article}\begin{document}warmup\end{document}"
+
+def _log_wait(started: float) -> None:
+    waited = time.perf_counter() - started
+    if waited > _SLOW_WAIT_SEC:
+        logger.info("tectonic compile waited %.2fs for one of %d slots", waited, MAX_PARALLEL)
+
+@contextlib.contextmanager
+def _sync_slot() -> Iterator[None]:
+    started = time.perf_counter()
+    with _sync_slots:
+        _log_wait(started)
+        yield
+
+@contextlib.asynccontextmanager
+async def _async_slot() -> AsyncIterator[None]:
+    started = time.perf_counter()
+    async with _async_slots:
+        _log_wait(started)
+        yield
 
 def _sanitize_name(n: str) -> str:
     return "".join(c for c in n if c.isalnum() or c in ("-", "_", ".")).strip() or "resume"
 
+@functools.lru_cache(maxsize=1)
+def _host_tectonic() -> Optional[str]:
+    return shutil.which("tectonic") if USE_HOST_BIN else None
+
+def _host_cmd(tectonic: str, tmpdir_path: pathlib.Path, texname: str) -> List[str]:
+    cmd = [tectonic, str(tmpdir_path / texname), "--outdir", str(tmpdir_path), "--chatter=minimal"]
+    if HOST_UNSHARE:
+        return [*_UNSHARE_PREFIX, *cmd]
+    return cmd
+
+def _compile_cmd(tmpdir_path: pathlib.Path, texname: str, image: str) -> List[str]:
+    tectonic = _host_tectonic()
+    if tectonic:
+        return _host_cmd(tectonic, tmpdir_path, texname)
+    return _docker_run_cmd(tmpdir_path, texname, image)
+
+def _docker_run_cmd(tmpdir_path: pathlib.Path, texname: str, image: str) -> List[str]:
+    # Mount tmpdir as /data and run tectonic on the file, placing output in /data
+    return [*_DOCKER_RUN_PREFIX, "-v", f"{tmpdir_path}:/data:Z", image, "tectonic", f"/data/{texname}", "--outdir", "/data"]
+
 def compile_tex_with_tectonic(
     tex_source: str,
     image: str = DEFAULT_IMAGE,
@@ -37,40 +121,38 @@ def compile_tex_with_tectonic(
     """
     Blocking call. Returns (success, pdf_bytes_or_empty, log_text).
     Raises no exceptions - always returns (False, b'', log) on error.
+    Waits for one of MAX_PARALLEL slots before starting tectonic.
     """
-    tmp_root = pathlib.Path(workdir_root) if workdir_root else None
-    tmpdir = tempfile.mkdtemp(prefix="tectonic_", dir=str(tmp_root) if tmp_root else None)
+    with _sync_slot():
+        return _compile_blocking(tex_source, image, timeout, workdir_root)
+
+def _compile_blocking(tex_source: str, image: str, timeout: int, workdir_root: Optional[str]) -> Tuple[bool, bytes, str]:
+    if USE_POOL and not _host_tectonic():
+        pooled = compile_in_pool(tex_source, image, timeout)
+        if pooled is not None:
+            return pooled
+
+    tmpdir = tempfile.mkdtemp(prefix="tectonic_", dir=workdir_root or TEX_SCRATCH_ROOT)
     tmpdir_path = pathlib.Path(tmpdir)
     try:
         texname = _sanitize_name("resume") + ".tex"
         tex_path = tmpdir_path / texname
         tex_path.write_text(tex_source, encoding="utf-8")
 
-        # Build docker run command
-        # Mount tmpdir as /data and run tectonic on the file, placing output in /data
-        docker_cmd = [
-            "docker",
-            "run",
-            "--rm",
-            "--network", "none",  # remove network for extra safety
-            "-v", f"{str(tmpdir_path)}:/data:Z",
-            image,
-            "tectonic",
-            f"/data/{texname}",
-            "--outdir", "/data"
-        ]
-
-        # run the docker command
-        proc = subprocess.run(docker_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout, check=False)
-        out = proc.stdout.decode("utf-8", errors="replace")
+        docker_cmd = _compile_cmd(tmpdir_path, texname, image)
+
+        # run the docker command; its output goes to a log file, read back only on failure
+        log_path = tmpdir_path / "tectonic.log"
+        with open(log_path, "wb") as log_f:
+            proc = subprocess.run(docker_cmd, stdout=log_f, stderr=subprocess.STDOUT, timeout=timeout, check=False)
 
         # expected PDF path
         pdf_path = tmpdir_path / texname.replace(".tex", ".pdf")
         if proc.returncode != 0 or not pdf_path.exists():
-            return False, b"", out
+            return False, b"", read_log_tail(log_path)
 
         pdf_bytes = pdf_path.read_bytes()
-        return True, pdf_bytes, out
+        return True, pdf_bytes, ""
 
     except subprocess.TimeoutExpired as te:
         return False, b"", f"Timeout after {timeout}s: {str(te)}"
@@ -80,8 +162,101 @@ def compile_tex_with_tectonic(
     except Exception as exc:
         return False, b"", f"Error: {str(exc)}"
     finally:
-        # best-effort cleanup
-        try:
-            shutil.rmtree(tmpdir_path)
-        except Exception:
-            pass
+        remove_workdir_later(tmpdir_path)
+
+async def compile_tex_to_pdf_file(
+    tex_source: str,
+    image: str = DEFAULT_IMAGE,
+    timeout: int = DEFAULT_TIMEOUT,
+    workdir_root: Optional[str] = None,
+) -> Tuple[bool, Optional[pathlib.Path], str]:
+    """
+    Compile as a coroutine and leave the PDF on disk: returns (success, pdf_path, log).
+    On success the caller owns pdf_path.parent and must release it with discard_pdf()
+    (e.g. as the BackgroundTask of a FileResponse). Nothing is left behind on failure.
+    Waits for one of MAX_PARALLEL slots before starting tectonic.
+    """
+    async with _async_slot():
+        return await _compile_to_file(tex_source, image, timeout, workdir_root)
+
+async def _compile_to_file(tex_source: str, image: str, timeout: int, workdir_root: Optional[str]) -> Tuple[bool, Optional[pathlib.Path], str]:
+    if USE_POOL and not _host_tectonic():
+        pooled = await compile_in_pool_to_file(tex_source, image, timeout)
+        if pooled is not None:
+            return pooled
+
+    tmpdir_path = pathlib.Path(tempfile.mkdtemp(prefix="tectonic_", dir=workdir_root or TEX_SCRATCH_ROOT))
+    keep = False
+    try:
+        texname = _sanitize_name("resume") + ".tex"
+        (tmpdir_path / texname).write_bytes(tex_source.encode("utf-8"))
+        log_path = tmpdir_path / "tectonic.log"
+        returncode, _ = await run_subprocess(_compile_cmd(tmpdir_path, texname, image), timeout, log_path=log_path)
+
+        pdf_path = tmpdir_path / texname.replace(".tex", ".pdf")
+        if returncode != 0 or not pdf_path.exists():
+            return False, None, read_log_tail(log_path)
+        keep = True
+        return True, pdf_path, ""
+
+    except asyncio.TimeoutError:
+        return False, None, f"Timeout after {timeout}s"
+    except FileNotFoundError as fe:
+        # docker binary not found or image missing
+        return False, None, f"Runtime error: {str(fe)}"
+    except Exception as exc:
+        return False, None, f"Error: {str(exc)}"
+    finally:
+        if not keep:
+            remove_workdir_later(tmpdir_path)
+
+async def discard_pdf(pdf_path: pathlib.Path) -> None:
+    """Remove the working directory holding a PDF from compile_tex_to_pdf_file."""
+    await asyncio.to_thread(shutil.rmtree, pdf_path.parent, True)
+
+async def compile_tex_with_tectonic_async(
+    tex_source: str,
+    image: str = DEFAULT_IMAGE,
+    timeout: int = DEFAULT_TIMEOUT,
+    workdir_root: Optional[str] = None,
+) -> Tuple[bool, bytes, str]:
+    """
+    Same contract as compile_tex_with_tectonic, but docker runs as an asyncio
+    child process, so no thread is held for the length of the compile.
+    """
+    success, pdf_path, log = await compile_tex_to_pdf_file(tex_source, image, timeout, workdir_root)
+    if not success:
+        return False, b"", log
+    try:
+        return True, pdf_path.read_bytes(), log
+    finally:
+        remove_workdir_later(pdf_path.parent)
+
+def _ensure_image(image: str) -> None:
+    """`docker pull` the image unless it is already present locally."""
+    try:
+        inspect = subprocess.run([DOCKER_BIN, "image", "inspect", image], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30, check=False)
+        if inspect.returncode == 0:
+            return
+        pull = subprocess.run([DOCKER_BIN, "pull", image], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=600, check=False)
+        if pull.returncode != 0:
+            logger.warning("could not pull %s: %s", image, pull.stdout.decode("utf-8", errors="replace").strip())
+    except (FileNotFoundError, subprocess.TimeoutExpired) as exc:
+        logger.warning("could not check/pull %s: %s", image, exc)
+
+def warm_up_tectonic(image: str = DEFAULT_IMAGE, timeout: int = 60) -> bool:
+    """
+    Blocking call. Make sure the image is present, then compile a stub document and
+    discard it, so the warm container is running and tectonic's caches are populated.
+    Returns whether the stub compiled.
+    """
+    started = time.perf_counter()
+    if not _host_tectonic():
+        _ensure_image(image)
+    ok, _, log = compile_tex_with_tectonic(_WARMUP_TEX, image=image, timeout=timeout)
+    elapsed = time.perf_counter() - started
+    if ok:
+        logger.info("tectonic warm-up done in %.2fs", elapsed)
+    else:
+        logger.warning("tectonic warm-up failed after %.2fs: %s", elapsed, log.strip()[-500:])
+    return ok
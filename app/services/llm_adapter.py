@@ -6,35 +6,75 @@ Environment:
 - LLM_ADAPTER: "mock" (default) or "http"
 - LLM_ALLOW_FALLBACK: "true" or "1" to allow falling back to mock when HTTP adapter fails
 
+- LLM_MAX_CONCURRENCY: max stage calls in flight at once (default 8)
+- LLM_CACHE_TTL_SEC: lifetime of cached stage responses (0 disables, see llm_cache)
+- LLM_BATCH_WINDOW_MS: if > 0 and the adapter has run_stage_batch, single calls to the
+  same (stage, seed) arriving within this window go out as one batch (default 0, off)
+
+Identical (stage, payload, seed) calls that overlap in time share one adapter call:
+the first caller runs it, the rest await its result.
+
 Public:
 - async def run_stage(stage_name: str, payload: dict, seed: int = 42) -> dict
+- async def run_stages(specs) -> list[dict]  (independent stages, run concurrently)
+- async def run_stage_batch(stage_name, payloads, seed=42) -> list[dict]  (one stage over many inputs)
+- async def aclose() -> None  (release the adapter's pooled connections, if any)
 """
 
 import os
+import copy
 import importlib
 import asyncio
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import orjson
 
 from app.core.config import settings
+from app.services import llm_cache
+from app.utils.singleflight import singleflight
 
 _ADAPTER_NAME = getattr(settings, "LLM_ADAPTER", os.getenv("LLM_ADAPTER", "mock"))
 _ALLOW_FALLBACK = str(getattr(settings, "LLM_ALLOW_FALLBACK", os.getenv("LLM_ALLOW_FALLBACK", "true"))).lower() in ("1","true","yes")
 
+_CACHE_TTL = int(getattr(settings, "LLM_CACHE_TTL_SEC", 0))
+
 _adapter = None
 
+# cache key -> future of the adapter call currently running for it ("singleflight")
+_INFLIGHT: Dict[str, asyncio.Future] = {}
+
+# caps in-flight adapter calls (provider rate limits), however many stages are gathered
+_SEM = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+
+_BATCH_WINDOW = int(os.getenv("LLM_BATCH_WINDOW_MS", "0")) / 1000
+# (stage, seed) -> calls waiting for the current batch window to close
+_PENDING: Dict[Tuple[str, int], List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+_FLUSHERS: Set[asyncio.Task] = set()
+
+_ADAPTER_MODULES = {
+    "mock": "app.services.llm_adapters.mock_adapter",
+    "http": "app.services.llm_adapters.http_adapter",
+}
+# name -> imported adapter module, so switching/reloading never re-imports
+_loaded: Dict[str, Any] = {}
+
+def _import_adapter(name: str):
+    mod = _loaded.get(name)
+    if mod is None:
+        # unknown names are treated as a dotted module path (dynamic import)
+        mod = importlib.import_module(_ADAPTER_MODULES.get(name, name))
+        # adapter module must implement async run_stage
+        if not hasattr(mod, "run_stage"):
+            raise RuntimeError(f"Adapter {name} does not expose run_stage()")
+        _loaded[name] = mod
+    return mod
+
 def _load_adapter(name: str):
     global _adapter
-    if name == "mock":
-        mod = importlib.import_module("app.services.llm_adapters.mock_adapter")
-    elif name == "http":
-        mod = importlib.import_module("app.services.llm_adapters.http_adapter")
-    else:
-        # try dynamic import
-        mod = importlib.import_module(name)
-    # adapter module must implement async run_stage
-    if not hasattr(mod, "run_stage"):
-        raise RuntimeError(f"Adapter {name} does not expose run_stage()")
-    _adapter = mod
+    _adapter = _import_adapter(name)
+
+# resolved once: the fallback path is then a plain attribute call, not an import
+_MOCK = _import_adapter("mock")
 
 # load at import time
 try:
@@ -49,21 +89,136 @@ except Exception:
 async def run_stage(stage_name: str, payload: Dict[str, Any], seed: int = 42) -> Dict[str, Any]:
     """
     Unified entry to call the configured adapter.
+    Responses are served from llm_cache when the same (stage, payload, seed) was seen before,
+    and concurrent identical calls are collapsed into one.
     If adapter fails and fallback is allowed, fall back to mock adapter.
     """
     global _adapter
     if _adapter is None:
         _load_adapter(_ADAPTER_NAME)
 
+    key = llm_cache.cache_key(stage_name, payload, seed)
+    if _CACHE_TTL > 0:
+        hit = await llm_cache.get(key)
+        if hit is not None:
+            return orjson.loads(hit)
+
+    return await singleflight(_INFLIGHT, key, lambda: _call_adapter(stage_name, payload, seed, key))
+
+async def _call_adapter(stage_name: str, payload: Dict[str, Any], seed: int, key: str) -> Dict[str, Any]:
     try:
-        result = await _adapter.run_stage(stage_name, payload, seed=seed)
+        if _BATCH_WINDOW > 0 and hasattr(_adapter, "run_stage_batch"):
+            result = await _enqueue(stage_name, payload, seed)
+        else:
+            async with _SEM:
+                result = await _adapter.run_stage(stage_name, payload, seed=seed)
+        # only real adapter output is cached; mock fallbacks below are not
+        if _CACHE_TTL > 0:
+            await llm_cache.set(key, orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS), ex=_CACHE_TTL)
         return result
     except Exception as exc:
         # if fallback allowed, use mock adapter
         if _ALLOW_FALLBACK:
             try:
-                mock = importlib.import_module("app.services.llm_adapters.mock_adapter")
-                return await mock.run_stage(stage_name, payload, seed=seed)
+                return await _MOCK.run_stage(stage_name, payload, seed=seed)
             except Exception:
                 raise
         raise
+
+async def _enqueue(stage_name: str, payload: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+    group = (stage_name, seed)
+    pending = _PENDING.get(group)
+    if pending is None:
+        pending = _PENDING[group] = []
+        task = loop.create_task(_flush_after_window(group))
+        _FLUSHERS.add(task)
+        task.add_done_callback(_FLUSHERS.discard)
+    pending.append((payload, fut))
+    return await fut
+
+async def _flush_after_window(group: Tuple[str, int]) -> None:
+    await asyncio.sleep(_BATCH_WINDOW)
+    items = _PENDING.pop(group, [])
+    stage_name, seed = group
+    try:
+        async with _SEM:
+            results = await _adapter.run_stage_batch(stage_name, [p for p, _ in items], seed=seed)
+        if len(results) != len(items):
+            raise RuntimeError(f"batch for {stage_name} returned {len(results)} results for {len(items)} inputs")
+    except Exception as exc:
+        for _, fut in items:
+            if not fut.done():
+                fut.set_exception(exc)
+        return
+    for (_, fut), result in zip(items, results):
+        if not fut.done():
+            fut.set_result(result)
+
+async def run_stage_batch(stage_name: str, payloads: Iterable[Dict[str, Any]], seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Run one stage over many inputs; results come back in input order.
+    Cached inputs are served from llm_cache and duplicates are sent once. The rest go
+    to the adapter's run_stage_batch in a single call when it has one (falling back to
+    mock per item on failure, if allowed), otherwise through run_stage concurrently.
+    """
+    global _adapter
+    if _adapter is None:
+        _load_adapter(_ADAPTER_NAME)
+
+    payloads = list(payloads)
+    keys = [llm_cache.cache_key(stage_name, p, seed) for p in payloads]
+    found: Dict[str, Dict[str, Any]] = {}
+    if _CACHE_TTL > 0:
+        unique = list(dict.fromkeys(keys))
+        for key, hit in zip(unique, await asyncio.gather(*(llm_cache.get(k) for k in unique))):
+            if hit is not None:
+                found[key] = orjson.loads(hit)
+
+    # first payload for each key still to fetch
+    todo: Dict[str, Dict[str, Any]] = {}
+    for key, payload in zip(keys, payloads):
+        if key not in found and key not in todo:
+            todo[key] = payload
+
+    if todo and hasattr(_adapter, "run_stage_batch"):
+        try:
+            async with _SEM:
+                results = await _adapter.run_stage_batch(stage_name, list(todo.values()), seed=seed)
+            if len(results) != len(todo):
+                raise RuntimeError(f"batch for {stage_name} returned {len(results)} results for {len(todo)} inputs")
+        except Exception:
+            if not _ALLOW_FALLBACK:
+                raise
+            results = [await _MOCK.run_stage(stage_name, p, seed=seed) for p in todo.values()]
+        else:
+            if _CACHE_TTL > 0:
+                await asyncio.gather(*(
+                    llm_cache.set(key, orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS), ex=_CACHE_TTL)
+                    for key, result in zip(todo, results)
+                ))
+        found.update(zip(todo, results))
+    elif todo:
+        found.update(zip(todo, await asyncio.gather(*(run_stage(stage_name, p, seed=seed) for p in todo.values()))))
+
+    out: List[Dict[str, Any]] = []
+    seen: Set[str] = set()
+    for key in keys:
+        # repeated inputs get their own copy
+        out.append(copy.deepcopy(found[key]) if key in seen else found[key])
+        seen.add(key)
+    return out
+
+async def run_stages(specs: Iterable[Tuple[str, Dict[str, Any], int]]) -> List[Dict[str, Any]]:
+    """
+    Run independent stages concurrently. specs are (stage_name, payload, seed)
+    tuples; results come back in the same order.
+    """
+    return list(await asyncio.gather(*(run_stage(name, payload, seed=seed) for name, payload, seed in specs)))
+
+async def aclose() -> None:
+    """Close pooled connections held by the loaded adapter (no-op for mock)."""
+    close = getattr(_adapter, "aclose", None)
+    if close is not None:
+        await close()
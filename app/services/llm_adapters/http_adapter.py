@@ -1,15 +1,125 @@
 import asyncio
+import importlib.util
+import logging
+import random
+import time
+from typing import Any, Optional
 import httpx
+import orjson
 from app.core.config import settings
 
-async def run_stage(stage_name: str, payload: dict, seed: int = 42) -> dict:
-    # Minimal HTTP adapter that posts the payload to configured LLM_HTTP_URL
-    # For tests, this will often be monkeypatched, so keep implementation simple.
+# Retries use full-jitter exponential backoff and honour Retry-After on 429/503 up to
+# LLM_BACKOFF_CAP_SEC (a longer Retry-After fails the call instead); other 4xx (except
+# 408/409/425) are not retried. After LLM_BREAKER_THRESHOLD consecutive failed calls the
+# adapter fails fast for LLM_BREAKER_COOLDOWN_SEC (circuit breaker), so llm_adapter
+# falls back to mock without waiting on retries.
+RETRIES = int(getattr(settings, "LLM_RETRIES", 2))
+BACKOFF = float(getattr(settings, "LLM_BACKOFF_FACTOR", 0.5))
+BACKOFF_CAP = float(getattr(settings, "LLM_BACKOFF_CAP_SEC", 8))
+BREAKER_THRESHOLD = int(getattr(settings, "LLM_BREAKER_THRESHOLD", 5))
+BREAKER_COOLDOWN = float(getattr(settings, "LLM_BREAKER_COOLDOWN_SEC", 30))
+
+# HTTP/2 needs the optional `h2` package (httpx[http2]); plain keep-alive otherwise
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+logger = logging.getLogger(__name__)
+
+# client errors worth retrying; any other 4xx will fail the same way again
+_RETRYABLE_4XX = (408, 409, 425, 429)
+_RETRY_AFTER_STATUS = (429, 503)
+
+# circuit breaker state, shared by all calls in the process
+_consecutive_failures = 0
+_open_until = 0.0
+
+# One client per process so stage calls reuse warm TCP/TLS connections
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+def _client() -> httpx.AsyncClient:
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        timeout = getattr(settings, "LLM_TIMEOUT_SEC", 20)
+        api_key = getattr(settings, "LLM_API_KEY", None)
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        _CLIENT = httpx.AsyncClient(http2=_HTTP2, timeout=timeout, limits=_LIMITS, headers=headers)
+    return _CLIENT
+
+async def aclose() -> None:
+    """Close the shared client (called from the app shutdown hook)."""
+    global _CLIENT
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+def _retryable(exc: Exception) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status >= 500 or status in _RETRYABLE_4XX
+    return True
+
+def _retry_delay(attempt: int, exc: Exception) -> Optional[float]:
+    """Seconds to wait before the next attempt, or None if the server wants more than BACKOFF_CAP."""
+    # full jitter: uniform over [0, capped exponential]
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF * 2 ** (attempt - 1)))
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in _RETRY_AFTER_STATUS:
+        try:
+            retry_after = float(exc.response.headers.get("Retry-After", 0))
+        except ValueError:
+            return delay  # HTTP-date form: keep the jittered delay
+        if retry_after > BACKOFF_CAP:
+            # waiting would hold a concurrency slot (and every coalesced caller) for that
+            # long; give up so the mock fallback / breaker take over instead
+            return None
+        delay = max(delay, retry_after)
+    return delay
+
+def _record(success: bool) -> None:
+    global _consecutive_failures, _open_until
+    if success:
+        _consecutive_failures = 0
+        return
+    _consecutive_failures += 1
+    if _consecutive_failures >= BREAKER_THRESHOLD:
+        _open_until = time.monotonic() + BREAKER_COOLDOWN
+        logger.warning("LLM HTTP adapter: %d consecutive failures, failing fast for %ss", _consecutive_failures, BREAKER_COOLDOWN)
+
+async def _post(body: dict) -> Any:
+    """POST body to LLM_HTTP_URL with retries; returns the decoded JSON response."""
     url = getattr(settings, "LLM_HTTP_URL", None)
-    timeout = getattr(settings, "LLM_TIMEOUT_SEC", 20)
     if not url:
         raise RuntimeError("LLM_HTTP_URL is not configured")
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        resp = await client.post(url, json={"stage": stage_name, "payload": payload, "seed": seed})
-        resp.raise_for_status()
-        return resp.json()
+    if time.monotonic() < _open_until:
+        raise RuntimeError("LLM HTTP circuit open; skipping call")
+    content = orjson.dumps(body)
+    client = _client()
+    for attempt in range(1, RETRIES + 2):
+        try:
+            resp = await client.post(str(url), content=content, headers=_JSON_HEADERS)
+            resp.raise_for_status()
+            result = orjson.loads(resp.content)
+        except Exception as exc:
+            retryable = _retryable(exc)
+            delay = _retry_delay(attempt, exc) if attempt <= RETRIES and retryable else None
+            if delay is not None:
+                await asyncio.sleep(delay)
+                continue
+            # a rejected request (plain 4xx) says nothing about the provider's health
+            if retryable:
+                _record(False)
+            raise
+        _record(True)
+        return result
+
+async def run_stage(stage_name: str, payload: dict, seed: int = 42) -> dict:
+    # Minimal HTTP adapter that posts the payload to configured LLM_HTTP_URL
+    # For tests, this will often be monkeypatched, so keep implementation simple.
+    return await _post({"stage": stage_name, "payload": payload, "seed": seed})
+
+async def run_stage_batch(stage_name: str, payloads: list, seed: int = 42) -> list:
+    # One POST for many inputs; the endpoint must answer with a JSON list in input order
+    results = await _post({"stage": stage_name, "inputs": payloads, "seed": seed})
+    if not isinstance(results, list):
+        raise RuntimeError("batch response is not a JSON list")
+    return results
@@ -8,3 +8,6 @@ async def run_stage(stage_name: str, payload: dict, seed: int = 42) -> dict:
         "confidence": 0.9,
         "skills": payload.get("file_text", "").split(),
     }
+
+async def run_stage_batch(stage_name: str, payloads: list, seed: int = 42) -> list:
+    return [await run_stage(stage_name, p, seed=seed) for p in payloads]
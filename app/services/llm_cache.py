@@ -0,0 +1,100 @@
+# app/services/llm_cache.py
+"""
+Content-addressed cache for LLM stage responses.
+
+Key: digest (BLAKE2b by default, see key_digest) of the canonical (stage, payload, seed) JSON.
+Tier 1: bounded in-process cache (LOCAL_MAX entries) whose entries expire after
+        LLM_CACHE_TTL_SEC, like their Redis copies.
+Tier 2: Redis (settings.REDIS_URL), shared across workers; optional - if Redis
+        is missing or down the cache silently degrades to tier 1.
+
+Values are stored as the orjson-encoded bytes of the stage output.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import orjson
+from cachetools import TTLCache
+from app.core.config import settings
+from app.utils.deterministic_cache import key_digest
+
+try:
+    import redis.asyncio as aioredis
+except Exception:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+LOCAL_MAX = 4096
+KEY_PREFIX = "llm:"
+# after a Redis error, skip Redis for this long instead of failing on every call
+REDIS_RETRY_AFTER_SEC = 30
+
+_local: TTLCache = TTLCache(maxsize=LOCAL_MAX, ttl=settings.LLM_CACHE_TTL_SEC)
+_local_lock = threading.Lock()
+_redis = None
+_redis_down_until = 0.0
+
+
+def cache_key(stage_name: str, payload: Dict[str, Any], seed: int) -> str:
+    raw = orjson.dumps(
+        {"stage": stage_name, "payload": payload, "seed": seed},
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+    )
+    return KEY_PREFIX + key_digest(raw)
+
+
+def _redis_client():
+    global _redis
+    if aioredis is None or time.monotonic() < _redis_down_until:
+        return None
+    if _redis is None:
+        _redis = aioredis.from_url(settings.REDIS_URL, decode_responses=False)
+    return _redis
+
+
+def _redis_failed(exc: Exception) -> None:
+    global _redis_down_until
+    logger.warning("LLM cache: Redis unavailable, using local cache only for %ss: %s", REDIS_RETRY_AFTER_SEC, exc)
+    _redis_down_until = time.monotonic() + REDIS_RETRY_AFTER_SEC
+
+
+def _local_put(key: str, value: bytes) -> None:
+    with _local_lock:
+        _local[key] = value
+
+
+async def get(key: str) -> Optional[bytes]:
+    with _local_lock:
+        value = _local.get(key)
+        if value is not None:
+            return value
+    client = _redis_client()
+    if client is None:
+        return None
+    try:
+        value = await client.get(key)
+    except Exception as exc:
+        _redis_failed(exc)
+        return None
+    if value is not None:
+        _local_put(key, value)
+    return value
+
+
+async def set(key: str, value: bytes, ex: Optional[int] = None) -> None:
+    _local_put(key, value)
+    client = _redis_client()
+    if client is None:
+        return
+    try:
+        await client.set(key, value, ex=ex or settings.LLM_CACHE_TTL_SEC)
+    except Exception as exc:
+        _redis_failed(exc)
+
+
+def clear_local() -> None:
+    with _local_lock:
+        _local.clear()
@@ -1,10 +1,11 @@
-import hashlib, json
+import orjson
 from app.core.config import settings
+from app.utils.deterministic_cache import key_digest
 import httpx
 
 def _cache_key(stage: str, payload: dict):
-    key_input = json.dumps({"stage":stage,"payload":payload,"seed":settings.DETERMINISTIC_SEED}, sort_keys=True)
-    return hashlib.sha256(key_input.encode()).hexdigest()
+    key_input = orjson.dumps({"stage":stage,"payload":payload,"seed":settings.DETERMINISTIC_SEED}, option=orjson.OPT_SORT_KEYS)
+    return key_digest(key_input)
 
 def run_stage(stage_name: str, payload: dict, config: dict):
     key = _cache_key(stage_name, payload)
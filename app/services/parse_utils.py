@@ -1,13 +1,18 @@
 # app/services/parse_utils.py
 """
 Helpers to extract text from common resume file bytes.
-- PDF -> uses pdfminer.six
+- PDF -> uses pypdfium2 (PDFium bindings) when installed, else pdfminer.six
 - DOCX -> uses python-docx
 - TXT  -> decode bytes
 """
 
 from typing import Tuple
 import io
+import threading
+
+# PDFium is not thread-safe: concurrent calls (e.g. several asyncio.to_thread parses)
+# can crash the process, so every pypdfium2 call holds this lock
+_PDFIUM_LOCK = threading.Lock()
 
 def _is_pdf_bytes(b: bytes) -> bool:
     return b.startswith(b"%PDF")
@@ -33,10 +38,23 @@ def parse_docx_bytes(b: bytes) -> str:
     paras = [p.text.strip() for p in doc.paragraphs if p.text and p.text.strip()]
     return "\n".join(paras)
 
-def parse_pdf_bytes(b: bytes) -> str:
-    """
-    Extract text from PDF bytes using pdfminer.six high-level API.
-    """
+def _parse_pdf_pdfium(b: bytes) -> str:
+    import pypdfium2 as pdfium
+
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(b)
+        try:
+            texts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return "\n".join(texts)
+        finally:
+            pdf.close()
+
+def _parse_pdf_pdfminer(b: bytes) -> str:
     try:
         from pdfminer.high_level import extract_text_to_fp
     except Exception as e:
@@ -48,6 +66,18 @@ def parse_pdf_bytes(b: bytes) -> str:
     extract_text_to_fp(stream, output, laparams=None)
     return output.getvalue()
 
+def parse_pdf_bytes(b: bytes) -> str:
+    """
+    Extract text from PDF bytes. PDFium (C++) is far faster than pdfminer.six's pure
+    Python parser; pdfminer is kept for when pypdfium2 is missing or rejects the file.
+    CPU-bound: call via asyncio.to_thread from async code; PDFium calls are serialised
+    by a module lock, pdfminer parses still run in parallel.
+    """
+    try:
+        return _parse_pdf_pdfium(b)
+    except Exception:
+        return _parse_pdf_pdfminer(b)
+
 def extract_text_auto(b: bytes) -> Tuple[str, str]:
     """
     Try to detect type and parse. Returns (text, type_str).
@@ -2,6 +2,15 @@
 from typing import Dict, List, Any
 import re
 
+# compiled once at import rather than looked up in re's pattern cache on every call
+_SKILLS_RE = re.compile(r"(?:Skills|Technical Skills|Skills:)([\s\S]{0,400})", re.IGNORECASE)
+_SKILLS_SPLIT_RE = re.compile(r"[\n,;]")
+_BULLETS_RE = re.compile(r"[-•\u2022]\s*(.+)")
+_SENTENCE_SPLIT_RE = re.compile(r"\.\s+")
+_REQUIRED_RE = re.compile(r"(?:Required Qualifications|Required|Qualifications:)([\s\S]{0,400})", re.IGNORECASE)
+_PREFERRED_RE = re.compile(r"(?:Preferred Qualifications|Preferred|Nice to have:)([\s\S]{0,400})", re.IGNORECASE)
+_LINE_SPLIT_RE = re.compile(r"[\n\r]+")
+
 def parse_resume_text(text: str) -> Dict[str, Any]:
     """
     Minimal rule-based parser to produce a basic resume JSON structure.
@@ -15,17 +24,17 @@ def parse_resume_text(text: str) -> Dict[str, Any]:
 
     # skills block: look for "Skills", "Technical Skills", etc.
     skills = []
-    m = re.search(r"(?:Skills|Technical Skills|Skills:)([\s\S]{0,400})", joined, re.IGNORECASE)
+    m = _SKILLS_RE.search(joined)
     if m:
         s = m.group(1).strip()
         # rudimentary split on commas or newlines
-        skills = [x.strip() for x in re.split(r"[\n,;]", s) if x.strip()][:50]
+        skills = [x.strip() for x in _SKILLS_SPLIT_RE.split(s) if x.strip()][:50]
 
     # experience heuristics: look for years or "•" bullets
-    bullets = re.findall(r"[-•\u2022]\s*(.+)", joined)
+    bullets = _BULLETS_RE.findall(joined)
     if not bullets:
         # fallback: break by sentences
-        bullets = re.split(r"\.\s+", joined)[:20]
+        bullets = _SENTENCE_SPLIT_RE.split(joined)[:20]
 
     parsed = {
         "contact": {"raw": "\n".join(contact_guess)},
@@ -49,12 +58,12 @@ def parse_job_text(text: str) -> Dict[str, Any]:
     must = []
     nice = []
     # find enumerated lines under headings
-    required_match = re.search(r"(?:Required Qualifications|Required|Qualifications:)([\s\S]{0,400})", joined, re.IGNORECASE)
+    required_match = _REQUIRED_RE.search(joined)
     if required_match:
-        must = [l.strip("-•* \t") for l in re.split(r"[\n\r]+", required_match.group(1)) if l.strip()][:30]
-    preferred_match = re.search(r"(?:Preferred Qualifications|Preferred|Nice to have:)([\s\S]{0,400})", joined, re.IGNORECASE)
+        must = [l.strip("-•* \t") for l in _LINE_SPLIT_RE.split(required_match.group(1)) if l.strip()][:30]
+    preferred_match = _PREFERRED_RE.search(joined)
     if preferred_match:
-        nice = [l.strip("-•* \t") for l in re.split(r"[\n\r]+", preferred_match.group(1)) if l.strip()][:30]
+        nice = [l.strip("-•* \t") for l in _LINE_SPLIT_RE.split(preferred_match.group(1)) if l.strip()][:30]
 
     return {
         "role_title": title,
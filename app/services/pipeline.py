@@ -1,85 +1,327 @@
 # app/services/pipeline.py (only updated run_assessment_pipeline function)
-from typing import Dict, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import orjson
+from cachetools import TTLCache
 from app.services.llm_adapter import run_stage
-from app.services.deterministic_cache import cache
+from app.services.deterministic_cache import DEFAULT_TTL, cache
+from beanie import PydanticObjectId
+from pymongo import UpdateOne
 from app.db.documents import Assessment, JobPosting, Resume
-from datetime import datetime
+from datetime import datetime, timezone
 import uuid
-from app.utils.deterministic_cache import make_cache_key
+from app.utils.deterministic_cache import content_hash, make_cache_key, text_hash
+from app.utils.singleflight import singleflight
 
 # new import
 from app.services.resume_parser import parse_resume_text
 
-async def run_assessment_pipeline(job_payload: Dict[str,Any], resume_payload: Dict[str,Any], seed: int = 42) -> Dict[str,Any]:
-    results = {}
-    # Define the ordered pipeline stages (name, metadata)
-    STAGES = [
-        ("A_JD_NORMALIZER", {}),
-        ("B_JD_EXTRACT", {}),
-        ("C_RESUME_PARSE", {}),
-        ("D_MATCHER_SCORER", {}),
-        ("E_RECOMMEND", {}),
-        ("F_LATEX_ADAPT", {}),
-    ]
-    for stage_name, _ in STAGES:
-        key = make_cache_key(stage_name, {"job": job_payload, "resume": resume_payload}, seed)
-        cached = None
+# stage -> (job_payload, resume_payload, upstream output hashes) -> the fields that stage's
+# cache key is built from. Only what the stage actually reads goes in, so an unrelated field
+# (e.g. resume uploaded_at) doesn't invalidate the job-side stages. Downstream stages key on
+# the content hash of their upstream outputs, so any upstream change propagates.
+STAGE_INPUT_BUILDERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any], Dict[str, str]], Dict[str, Any]]] = {
+    "A_JD_NORMALIZER": lambda job, resume, h: {"raw_text_hash": text_hash(job.get("raw_text") or ""), "company": job.get("company")},
+    "B_JD_EXTRACT": lambda job, resume, h: {"jd_normalized_hash": h["A_JD_NORMALIZER"]},
+    "C_RESUME_PARSE": lambda job, resume, h: {"file_text_hash": text_hash(resume.get("file_text") or ""), "original_layout": resume.get("original_layout", {})},
+    "D_MATCHER_SCORER": lambda job, resume, h: {"jd_extract_hash": h["B_JD_EXTRACT"], "resume_parse_hash": h["C_RESUME_PARSE"]},
+    "E_RECOMMEND": lambda job, resume, h: {"score_hash": h["D_MATCHER_SCORER"], "jd_extract_hash": h["B_JD_EXTRACT"], "resume_parse_hash": h["C_RESUME_PARSE"]},
+    "F_LATEX_ADAPT": lambda job, resume, h: {"recommendation_hash": h["E_RECOMMEND"], "template": "onepage"},
+}
+STAGES = tuple(STAGE_INPUT_BUILDERS)
+
+# resumes of one /assess_batch call in flight at once (LLM calls are capped separately)
+_BATCH_CONCURRENCY = int(os.getenv("ASSESS_BATCH_CONCURRENCY", "32"))
+
+# stage outputs of stored assessments, keyed by stage cache key
+STAGE_OUTPUTS_COLLECTION = "assessment_stages"
+
+# stage -> (job_payload, resume_payload, upstream outputs) -> the payload the stage runs on
+STAGE_PAYLOAD_BUILDERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any], Dict[str, Any]], Dict[str, Any]]] = {
+    "A_JD_NORMALIZER": lambda job, resume, r: {"content": job.get("raw_text", ""), "company": job.get("company")},
+    "B_JD_EXTRACT": lambda job, resume, r: {"cleaned_text": r["A_JD_NORMALIZER"].get("cleaned_text", ""), "role_title": r["A_JD_NORMALIZER"].get("role_title")},
+    "C_RESUME_PARSE": lambda job, resume, r: {"file_text": resume.get("file_text", ""), "original_layout": resume.get("original_layout", {})},
+    "D_MATCHER_SCORER": lambda job, resume, r: {"jd": r["B_JD_EXTRACT"], "resume": r["C_RESUME_PARSE"]},
+    "E_RECOMMEND": lambda job, resume, r: {"score": r["D_MATCHER_SCORER"].get("score"), "jd": r["B_JD_EXTRACT"], "resume": r["C_RESUME_PARSE"]},
+    "F_LATEX_ADAPT": lambda job, resume, r: {"recommendation": r["E_RECOMMEND"], "template": "onepage"},
+}
+
+# JD / resume text longer than this is hashed off the event loop
+_OFFLOAD_KEY_BYTES = 32 * 1024
+
+# regex-heavy resume parsing holds the GIL, so big resumes go to worker processes;
+# below this size pickling costs more than it saves and a thread is used instead
+_RESUME_POOL_MIN_CHARS = 16 * 1024
+_RESUME_POOL_WORKERS = int(os.getenv("RESUME_PARSE_PROCS", "0")) or os.cpu_count() or 1
+_RESUME_POOL: Optional[ProcessPoolExecutor] = None
+
+def _resume_pool() -> ProcessPoolExecutor:
+    # created on first use so importing the module (API, workers, tests) spawns nothing
+    global _RESUME_POOL
+    if _RESUME_POOL is None:
+        # forkserver, not the Linux default fork: this process already runs threads (compile
+        # and hashing pools, to_thread workers), and a forked child can inherit one of their
+        # locks held and deadlock
+        _RESUME_POOL = ProcessPoolExecutor(max_workers=_RESUME_POOL_WORKERS, mp_context=multiprocessing.get_context("forkserver"))
+    return _RESUME_POOL
+
+def shutdown_resume_pool() -> None:
+    global _RESUME_POOL
+    if _RESUME_POOL is not None:
+        _RESUME_POOL.shutdown(wait=False, cancel_futures=True)
+        _RESUME_POOL = None
+
+async def _parse_resume_off_loop(file_text: str, layout: Dict[str, Any]) -> Dict[str, Any]:
+    global _RESUME_POOL
+    if len(file_text) > _RESUME_POOL_MIN_CHARS:
         try:
-            cached = await cache.get(key)
-        except Exception:
-            cached = None
-        if cached is not None:
-            results[stage_name] = cached
-            continue
+            return await asyncio.get_running_loop().run_in_executor(_resume_pool(), parse_resume_text, file_text, layout)
+        except BrokenProcessPool:
+            # a worker died (OOM kill etc.): drop the pool, it is recreated on next use
+            _RESUME_POOL = None
+    return await asyncio.to_thread(parse_resume_text, file_text, layout)
+
+# in-process cache in front of Redis: repeat lookups (same JD across many resumes, retries)
+# skip the network round-trip. Values are kept as orjson bytes so callers can't mutate them;
+# entries expire with the Redis copies they mirror.
+_L1_MAX = 1024
+_L1: TTLCache = TTLCache(maxsize=_L1_MAX, ttl=DEFAULT_TTL)
+
+def _l1_get(key: str) -> Optional[Any]:
+    raw = _L1.get(key)
+    if raw is None:
+        return None
+    return orjson.loads(raw)
+
+def _l1_put(key: str, value: Any) -> None:
+    _L1[key] = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
 
-        # build stage-specific input
-        stage_input = {}
-        if stage_name == "A_JD_NORMALIZER":
-            stage_input = {"content": job_payload.get("raw_text",""), "company": job_payload.get("company")}
-            out = await run_stage(stage_name, stage_input, seed=seed)
-        elif stage_name == "B_JD_EXTRACT":
-            stage_input = {"cleaned_text": results.get("A_JD_NORMALIZER", {}).get("cleaned_text", ""), "role_title": results.get("A_JD_NORMALIZER",{}).get("role_title")}
-            out = await run_stage(stage_name, stage_input, seed=seed)
-        elif stage_name == "C_RESUME_PARSE":
-            # If we already have file_text from resume_payload, use deterministic rule-based parser
-            if resume_payload.get("file_text"):
-                parsed = parse_resume_text(resume_payload.get("file_text", ""), original_layout=resume_payload.get("original_layout", {}))
-                out = parsed
-                out["confidence"] = out.get("confidence", 0.8)
-            else:
-                # fallback to LLM-based mock parser
-                stage_input = {"file_text": resume_payload.get("file_text",""), "original_layout": resume_payload.get("original_layout", {})}
-                out = await run_stage(stage_name, stage_input, seed=seed)
-        elif stage_name == "D_MATCHER_SCORER":
-            stage_input = {"jd": results.get("B_JD_EXTRACT", {}), "resume": results.get("C_RESUME_PARSE", {})}
-            out = await run_stage(stage_name, stage_input, seed=seed)
-        elif stage_name == "E_RECOMMEND":
-            stage_input = {"score": results.get("D_MATCHER_SCORER", {}).get("score"), "jd": results.get("B_JD_EXTRACT", {}), "resume": results.get("C_RESUME_PARSE", {})}
-            out = await run_stage(stage_name, stage_input, seed=seed)
-        elif stage_name == "F_LATEX_ADAPT":
-            stage_input = {"recommendation": results.get("E_RECOMMEND", {}), "template":"onepage"}
-            out = run_stage(stage_name, stage_input, seed=seed)
+# stage cache key -> future of the computation currently running for it
+_INFLIGHT: Dict[str, asyncio.Future] = {}
+
+async def _cached_get(key: str) -> Optional[Any]:
+    value = _l1_get(key)
+    if value is not None:
+        return value
+    try:
+        value = await cache.get(key)
+    except Exception:
+        return None
+    if value is not None:
+        _l1_put(key, value)
+    return value
+
+async def _cached_set_many(items: Dict[str, Any]) -> None:
+    if not items:
+        return
+    for key, value in items.items():
+        _l1_put(key, value)
+    # one pipelined round-trip for every stage computed in this run
+    try:
+        await cache.set_many(items)
+    except Exception:
+        pass
+
+async def _prefetch_stages(keys: Dict[str, str]) -> Dict[str, Any]:
+    # keys that are known before anything runs are fetched in a single MGET
+    # instead of one round-trip per stage; L1 hits don't go to Redis at all
+    found: Dict[str, Any] = {}
+    stage_by_key: Dict[str, str] = {}
+    for name, key in keys.items():
+        value = _l1_get(key)
+        if value is not None:
+            found[name] = value
         else:
-            out = await run_stage(stage_name, {}, seed=seed)
+            stage_by_key[key] = name
+    if not stage_by_key:
+        return found
+    try:
+        fetched = await cache.get_many(stage_by_key)
+    except Exception:
+        return found
+    for key, value in fetched.items():
+        _l1_put(key, value)
+        found[stage_by_key[key]] = value
+    return found
+
+async def _cached_stage(stage_name: str, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]], writes: Dict[str, Any], prefetched: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    if prefetched is not None:
+        cached = prefetched.get(stage_name)
+    else:
+        cached = await _cached_get(key)
+    if cached is not None:
+        return cached
+    # concurrent runs missing the same key (hot JD) share one computation
+    out = await singleflight(_INFLIGHT, key, compute)
+    # written back in one batch when the pipeline finishes
+    writes[key] = out
+    return out
+
+def _doc_ref(payload: Dict[str, Any], field: str) -> Optional[str]:
+    # payloads are either queue messages ({"resume_id": ...}) or a loaded document's .dict()
+    # ({"id": ...}); "user_id" is only ever the former
+    ref = payload.get(field) or (payload.get("id") if field != "user_id" else None)
+    return str(ref) if ref is not None else None
+
+def _stage_collection():
+    return Assessment.get_pymongo_collection().database[STAGE_OUTPUTS_COLLECTION]
 
+async def _store_stage_outputs(outputs: Dict[str, Any]) -> None:
+    # keyed by content_hash of the output itself (not the stage cache key, which only
+    # covers the inputs), so an existing doc always holds exactly this output
+    ops = [UpdateOne({"_id": key}, {"$setOnInsert": {"output": out}}, upsert=True) for key, out in outputs.items()]
+    await _stage_collection().bulk_write(ops, ordered=False)
+
+async def load_stage_outputs(stage_hashes: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Rehydrate {stage: output} for a stored assessment's stage_hashes with one query on
+    the stage outputs collection. The stage cache is not consulted: it is keyed by
+    inputs, and may hold a different output than the one this assessment produced.
+    """
+    by_hash: Dict[str, Any] = {}
+    async for doc in _stage_collection().find({"_id": {"$in": list(set(stage_hashes.values()))}}):
+        by_hash[doc["_id"]] = doc["output"]
+    return {name: by_hash[h] for name, h in stage_hashes.items() if h in by_hash}
+
+async def _insert_assessment_raw(doc: Dict[str, Any]) -> None:
+    # results_json is already plain JSON data: building an Assessment model would
+    # re-validate the whole stages tree only to dump it straight back to a dict
+    await Assessment.get_pymongo_collection().insert_one(doc)
+
+async def _compute_stage(stage_name: str, payload: Dict[str, Any], seed: int) -> Dict[str, Any]:
+    # If we already have file_text from resume_payload, use deterministic rule-based parser
+    if stage_name == "C_RESUME_PARSE" and payload.get("file_text"):
+        parsed = await _parse_resume_off_loop(payload["file_text"], payload["original_layout"])
+        parsed["confidence"] = parsed.get("confidence", 0.8)
+        return parsed
+    return await run_stage(stage_name, payload, seed=seed)
+
+# (results, output hashes) of a finished run of some of the stages
+_GraphState = Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]
+
+async def _run_graph(job_payload: Dict[str, Any], resume_payload: Dict[str, Any], seed: int, done: Optional[_GraphState] = None, job_only: bool = False) -> _GraphState:
+    # Stage graph: A -> B (job side) and C (resume side) are independent and run
+    # concurrently; D needs B and C, E needs D, F needs E.
+    # Stages in `done` (a job-side run shared by a batch) are reused as-is;
+    # job_only runs just A -> B.
+    results: Dict[str, Dict[str, Any]] = dict(done[0]) if done else {}
+    hashes: Dict[str, str] = dict(done[1]) if done else {}
+    writes: Dict[str, Any] = {}
+
+    def stage_key(stage_name: str) -> str:
+        return make_cache_key(stage_name, STAGE_INPUT_BUILDERS[stage_name](job_payload, resume_payload, hashes), seed)
+
+    # A and C depend only on the request, so their keys are known up front. They hash the
+    # raw JD / resume text; when that's large it would hold the loop for milliseconds, so
+    # it's done on a worker thread instead.
+    root_text = {"A_JD_NORMALIZER": job_payload.get("raw_text") or ""}
+    if not job_only:
+        root_text["C_RESUME_PARSE"] = resume_payload.get("file_text") or ""
+    roots = {}
+    for name, text in root_text.items():
+        if name in results:
+            continue
+        if len(text) > _OFFLOAD_KEY_BYTES:
+            roots[name] = await asyncio.to_thread(stage_key, name)
+        else:
+            roots[name] = stage_key(name)
+    prefetched = await _prefetch_stages(roots)
+
+    async def stage(stage_name: str) -> None:
+        if stage_name in results:
+            return
+        payload = STAGE_PAYLOAD_BUILDERS[stage_name](job_payload, resume_payload, results)
+        compute = lambda: _compute_stage(stage_name, payload, seed)
+        if stage_name in roots:
+            key = roots[stage_name]
+            out = await _cached_stage(stage_name, key, compute, writes, prefetched)
+        else:
+            key = stage_key(stage_name)
+            out = await _cached_stage(stage_name, key, compute, writes)
+        hashes[stage_name] = content_hash(out)
         results[stage_name] = out
-        # store to cache
-        try:
-            await cache.set(key, out)
-        except Exception:
-            pass
 
+    async def jd_branch():
+        await stage("A_JD_NORMALIZER")
+        await stage("B_JD_EXTRACT")
+
+    try:
+        if job_only:
+            await jd_branch()
+        else:
+            await asyncio.gather(jd_branch(), stage("C_RESUME_PARSE"))
+            for stage_name in ("D_MATCHER_SCORER", "E_RECOMMEND", "F_LATEX_ADAPT"):
+                await stage(stage_name)
+    finally:
+        # partial progress is kept too, so a retry after a failed stage resumes from it
+        await _cached_set_many(writes)
+    return results, hashes
+
+def _assemble(job_payload: Dict[str, Any], resume_payload: Dict[str, Any], results: Dict[str, Dict[str, Any]], hashes: Dict[str, str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """The API result for one run and the Assessment document that stores it."""
     final = {
-        "id": str(uuid.uuid4()),
-        "created_at": datetime.utcnow().isoformat(),
-        "stages": results,
+        "id": uuid.uuid4().hex,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "stages": {name: results[name] for name in STAGES},
         "final_score": results.get("D_MATCHER_SCORER", {}).get("score", 0)
     }
+    # id minted client-side so the stored results_json already carries its
+    # assessment_id and callers never need a read-back after the insert
+    oid = PydanticObjectId()
+    final["assessment_id"] = str(oid)
+    doc = {
+        "_id": oid,
+        "user_id": _doc_ref(resume_payload, "user_id"),
+        "job_id": _doc_ref(job_payload, "job_id"),
+        "resume_id": _doc_ref(resume_payload, "resume_id"),
+        "score": final["final_score"],
+        # outputs are stored once by content hash (and shared across assessments);
+        # load_stage_outputs joins them back on read
+        "results_json": {**{k: v for k, v in final.items() if k != "stages"}, "stage_hashes": {name: hashes[name] for name in STAGES}},
+    }
+    return final, doc
+
+async def run_assessment_pipeline(job_payload: Dict[str,Any], resume_payload: Dict[str,Any], seed: int = 42) -> Dict[str,Any]:
+    results, hashes = await _run_graph(job_payload, resume_payload, seed)
+    final, doc = _assemble(job_payload, resume_payload, results, hashes)
     try:
-        a = Assessment(score=final["final_score"], results_json=final)
-        await a.insert()
-        final["assessment_id"] = str(a.id)
+        # stage outputs first, so a stored assessment never references missing ones
+        await _store_stage_outputs({hashes[name]: results[name] for name in STAGES})
+        await _insert_assessment_raw(doc)
     except Exception:
         final["assessment_id"] = None
     return final
+
+async def run_assessment_batch(job_payload: Dict[str, Any], resume_payloads: List[Dict[str, Any]], seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Assess many resumes against one JD. A -> B runs once and is shared; C..F fan out per
+    resume, at most ASSESS_BATCH_CONCURRENCY at a time. Results come back in input order
+    and are stored with one stage-outputs write and one insert_many.
+    """
+    job_side = await _run_graph(job_payload, {}, seed, job_only=True)
+    sem = asyncio.Semaphore(_BATCH_CONCURRENCY)
+
+    async def run_rest(resume_payload: Dict[str, Any]) -> _GraphState:
+        async with sem:
+            return await _run_graph(job_payload, resume_payload, seed, done=job_side)
+
+    runs = await asyncio.gather(*(run_rest(r) for r in resume_payloads))
+    finals, docs, outputs = [], [], {}
+    for resume_payload, (results, hashes) in zip(resume_payloads, runs):
+        final, doc = _assemble(job_payload, resume_payload, results, hashes)
+        finals.append(final)
+        docs.append(doc)
+        outputs.update((hashes[name], results[name]) for name in STAGES)
+    if not docs:
+        return finals
+    try:
+        await _store_stage_outputs(outputs)
+        await Assessment.get_pymongo_collection().insert_many(docs, ordered=False)
+    except Exception:
+        for final in finals:
+            final["assessment_id"] = None
+    return finals
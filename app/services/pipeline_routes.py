@@ -1,12 +1,22 @@
 # app/api/v1/pipeline_routes.py
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
-from app.services.pipeline import run_assessment_pipeline
-from app.db.documents import Assessment
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from app.services.pipeline import load_stage_outputs, run_assessment_batch, run_assessment_pipeline
+from beanie import PydanticObjectId
+from bson.errors import InvalidId
+from app.db.documents import Assessment, JobPosting, Resume
+from app.core.config import settings
 
 router = APIRouter()
 
+def _object_id(doc_id: str) -> Optional[PydanticObjectId]:
+    """Parse a path/body id once; None for anything that can't be an ObjectId."""
+    try:
+        return PydanticObjectId(doc_id)
+    except (InvalidId, TypeError):
+        return None
+
 class AssessRequest(BaseModel):
     job_id: Optional[str] = None
     resume_id: Optional[str] = None
@@ -19,7 +29,8 @@ class AssessRequest(BaseModel):
 async def assess(payload: AssessRequest):
     # For demo: accept job_payload/resume_payload directly if present
     if payload.job_payload is None and payload.job_id:
-        job = await (await __import__("app.db.documents", fromlist=["JobPosting"]).JobPosting.get(payload.job_id))
+        oid = _object_id(payload.job_id)
+        job = await JobPosting.get(oid) if oid else None
         if job:
             job_payload = job.dict()
         else:
@@ -28,7 +39,8 @@ async def assess(payload: AssessRequest):
         job_payload = payload.job_payload or {}
 
     if payload.resume_payload is None and payload.resume_id:
-        resume = await (await __import__("app.db.documents", fromlist=["Resume"]).Resume.get(payload.resume_id))
+        oid = _object_id(payload.resume_id)
+        resume = await Resume.get(oid) if oid else None
         if resume:
             resume_payload = resume.dict()
         else:
@@ -39,9 +51,25 @@ async def assess(payload: AssessRequest):
     result = await run_assessment_pipeline(job_payload, resume_payload, seed=payload.seed)
     return result
 
+class AssessBatchRequest(BaseModel):
+    job_payload: dict
+    # bounded: every entry is a full pipeline run, and all results are held for one insert_many
+    resume_payloads: List[dict] = Field(..., max_length=settings.ASSESS_BATCH_MAX)
+    seed: int = 42
+
+@router.post("/assess_batch")
+async def assess_batch(payload: AssessBatchRequest):
+    # one JD against many resumes: the JD stages run once for the whole batch
+    return await run_assessment_batch(payload.job_payload, payload.resume_payloads, seed=payload.seed)
+
 @router.get("/assessments/{assessment_id}")
 async def get_assessment(assessment_id: str):
-    a = await Assessment.get(assessment_id)
+    # malformed ids can't match anything: answer 404 without a Mongo round-trip
+    oid = _object_id(assessment_id)
+    a = await Assessment.get(oid) if oid else None
     if not a:
         raise HTTPException(404, "Not found")
+    results = a.results_json or {}
+    if "stage_hashes" in results and "stages" not in results:
+        a.results_json = {**results, "stages": await load_stage_outputs(results["stage_hashes"])}
     return a
@@ -1,7 +1,9 @@
 # app/services/queue.py
-import json
+import functools
+import logging
 import uuid
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import orjson
 import redis.asyncio as aioredis
 from app.core.config import settings
 
@@ -9,7 +11,17 @@ STREAM_KEY = "pipeline:stream"
 GROUP_NAME = "pipeline:group"
 DLQ_KEY = "pipeline:dlq"
 
+# approximate (~) MAXLEN caps: Redis trims whole macro-nodes, O(1) amortized per XADD.
+# Trimming drops the oldest entries whether or not they were acked, so the cap must sit
+# well above any realistic backlog.
+STREAM_MAXLEN = settings.PIPELINE_STREAM_MAXLEN
+DLQ_MAXLEN = settings.PIPELINE_DLQ_MAXLEN
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=1)
 def _get_redis_client():
+    # one client (and connection pool) per process instead of one per call
     url = getattr(settings, "REDIS_URL", "redis://localhost:6379/0")
     return aioredis.from_url(url, decode_responses=True)
 
@@ -24,6 +36,12 @@ async def ensure_group_exists(stream: str = STREAM_KEY, group: str = GROUP_NAME)
             return
         raise
 
+def _stream_entry(payload: Dict[str, Any], idempotency_key: Optional[str]) -> Dict[str, Any]:
+    return {
+        "payload": orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS),
+        "idempotency_key": idempotency_key or "",
+    }
+
 async def enqueue_stream_job(payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> str:
     """
     Add a job to Redis Stream. Returns the stream id.
@@ -31,20 +49,42 @@ async def enqueue_stream_job(payload: Dict[str, Any], idempotency_key: Optional[
     idempotency_key: optional string to avoid duplicated processing (worker will check)
     """
     client = _get_redis_client()
-    entry = {
-        "payload": json.dumps(payload, ensure_ascii=False),
-        "idempotency_key": idempotency_key or "",
-    }
-    # XADD stream * field value ...
-    sid = await client.xadd(STREAM_KEY, entry)
+    # XADD stream MAXLEN ~ n * field value ...
+    sid = await client.xadd(STREAM_KEY, _stream_entry(payload, idempotency_key), maxlen=STREAM_MAXLEN, approximate=True)
     return str(sid)
 
+async def enqueue_stream_jobs(payloads: List[Dict[str, Any]], idempotency_keys: Optional[List[Optional[str]]] = None) -> List[str]:
+    """
+    Add several jobs in one round-trip (non-transactional pipeline). Returns the
+    stream ids in input order. idempotency_keys, if given, pairs up with payloads.
+    """
+    if not payloads:
+        return []
+    keys = idempotency_keys or [None] * len(payloads)
+    client = _get_redis_client()
+    async with client.pipeline(transaction=False) as pipe:
+        for payload, key in zip(payloads, keys):
+            pipe.xadd(STREAM_KEY, _stream_entry(payload, key), maxlen=STREAM_MAXLEN, approximate=True)
+        sids = await pipe.execute()
+    return [str(sid) for sid in sids]
+
+async def enqueue_stream_job_safe(payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> Optional[str]:
+    """
+    Best-effort enqueue for fire-and-forget use (e.g. FastAPI BackgroundTasks).
+    Logs and returns None on failure instead of raising.
+    """
+    try:
+        return await enqueue_stream_job(payload, idempotency_key=idempotency_key)
+    except Exception:
+        logger.exception("Failed to enqueue pipeline job (idempotency_key=%s)", idempotency_key)
+        return None
+
 # helper to move to DLQ with metadata
 async def move_to_dlq(stream_id: str, payload: Dict[str, Any], reason: str):
     client = _get_redis_client()
     entry = {
         "original_id": stream_id,
-        "payload": json.dumps(payload, ensure_ascii=False),
+        "payload": orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS),
         "reason": reason
     }
-    return await client.xadd(DLQ_KEY, entry)
+    return await client.xadd(DLQ_KEY, entry, maxlen=DLQ_MAXLEN, approximate=True)
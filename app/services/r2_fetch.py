@@ -1,29 +1,36 @@
 # app/services/r2_fetch.py
-import concurrent.futures
-import io
-from typing import Optional
-from app.core.config import settings
-import boto3
+"""
+Fetch uploaded objects from S3/R2.
 
-_thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+With aioboto3 installed, reads go over aiobotocore's native async HTTP client: one
+client per event loop, opened on first use and closed by aclose() at shutdown.
+Without it, the blocking boto3 client runs on the loop's default thread pool.
 
-def _get_s3_client():
-    """
-    Reuse same boto3 client config used for presign.
-    """
-    endpoint = getattr(settings, "S3_ENDPOINT", None)
-    access_key = getattr(settings, "S3_ACCESS_KEY", None)
-    secret = getattr(settings, "S3_SECRET_KEY", None)
-    region = getattr(settings, "S3_REGION", None) or "us-east-1"
-
-    client_kwargs = {}
-    if access_key and secret:
-        client_kwargs["aws_access_key_id"] = access_key
-        client_kwargs["aws_secret_access_key"] = secret
-    if endpoint:
-        client_kwargs["endpoint_url"] = endpoint
-    client_kwargs["region_name"] = region
-    return boto3.client("s3", **client_kwargs)
+Large objects are downloaded as parallel ranged GETs of PART_SIZE bytes. The first
+part doubles as the size probe (Content-Range), so small files still cost one request.
+get_object_stream() yields the body in chunks as it arrives instead.
+"""
+import asyncio
+import re
+from typing import AsyncIterator, Optional
+# same cached client as presign: boto3 client construction (config, endpoint data,
+# signers) is far more expensive than the calls made with it
+from app.services.r2_presign import _client_kwargs, _get_s3_client
+
+try:
+    import aioboto3
+except Exception:
+    aioboto3 = None
+
+PART_SIZE = 8 * 1024 * 1024
+STREAM_CHUNK = 64 * 1024
+_CONTENT_RANGE_TOTAL = re.compile(r"/(\d+)$")
+
+# async client state: the client is tied to the loop it was opened on
+_async_cm = None
+_async_client = None
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_lock: Optional[asyncio.Lock] = None
 
 def _get_object_bytes(bucket: str, key: str) -> bytes:
     """
@@ -34,10 +41,70 @@ def _get_object_bytes(bucket: str, key: str) -> bytes:
     body = resp["Body"].read()
     return body
 
+async def _get_async_client():
+    global _async_cm, _async_client, _async_loop, _async_lock
+    loop = asyncio.get_running_loop()
+    if _async_client is not None and _async_loop is loop:
+        return _async_client
+    if _async_lock is None or _async_loop is not loop:
+        _async_lock, _async_loop, _async_client = asyncio.Lock(), loop, None
+    # concurrent first calls must not each open (and leak) a client
+    async with _async_lock:
+        if _async_client is None:
+            cm = aioboto3.Session().client("s3", **_client_kwargs())
+            _async_client = await cm.__aenter__()
+            _async_cm = cm
+    return _async_client
+
+async def aclose() -> None:
+    """Close the async S3 client, if one was opened (call on app shutdown)."""
+    global _async_cm, _async_client, _async_loop
+    if _async_cm is not None:
+        cm, _async_cm, _async_client = _async_cm, None, None
+        await cm.__aexit__(None, None, None)
+
+async def _get_range(client, bucket: str, key: str, start: int, end: int, **extra):
+    resp = await client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", **extra)
+    async with resp["Body"] as stream:
+        return resp, await stream.read()
+
 async def get_object_bytes(bucket: str, key: str) -> Optional[bytes]:
     """
     Async wrapper for fetching object bytes from S3/R2.
     Returns bytes or raises exception (let caller decide retry).
     """
-    loop = __import__("asyncio").get_event_loop()
-    return await loop.run_in_executor(_thread_pool, _get_object_bytes, bucket, key)
+    if aioboto3 is None:
+        # default executor (min(32, cpu + 4) threads) rather than a private 3-thread
+        # pool that capped concurrent downloads
+        return await asyncio.to_thread(_get_object_bytes, bucket, key)
+    client = await _get_async_client()
+    try:
+        resp, first = await _get_range(client, bucket, key, 0, PART_SIZE - 1)
+    except client.exceptions.ClientError as exc:
+        # a range request on an empty object is "unsatisfiable"
+        if exc.response.get("Error", {}).get("Code") == "InvalidRange":
+            return b""
+        raise
+    m = _CONTENT_RANGE_TOTAL.search(resp.get("ContentRange") or "")
+    total = int(m.group(1)) if m else len(first)
+    if total <= len(first):
+        return first
+    # pin the remaining parts to the version the first part came from: if the object
+    # is overwritten mid-download they fail (412) instead of mixing two versions
+    pin = {"IfMatch": resp["ETag"]} if resp.get("ETag") else {}
+    rest = await asyncio.gather(*(
+        _get_range(client, bucket, key, start, min(start + PART_SIZE, total) - 1, **pin)
+        for start in range(len(first), total, PART_SIZE)
+    ))
+    return b"".join([first, *(body for _, body in rest)])
+
+async def get_object_stream(bucket: str, key: str) -> AsyncIterator[bytes]:
+    """Yield the object body in chunks as it downloads (for consumers that can work incrementally)."""
+    if aioboto3 is None:
+        yield await get_object_bytes(bucket, key)
+        return
+    client = await _get_async_client()
+    resp = await client.get_object(Bucket=bucket, Key=key)
+    async with resp["Body"] as stream:
+        async for chunk in stream.iter_chunks(STREAM_CHUNK):
+            yield chunk
@@ -1,19 +1,13 @@
 # app/services/r2_presign.py
 import boto3
 import functools
-import concurrent.futures
 import os
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Iterable
 from app.core.config import settings
 
-# Use synchronous boto3 but run blocking calls in threadpool to keep code async-friendly
-_thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=3)
-
-def _get_s3_client():
-    """
-    Create a boto3 S3 client configured for Cloudflare R2 (S3-compatible).
-    Expects settings.S3_ENDPOINT, S3_ACCESS_KEY, S3_SECRET_KEY, S3_REGION, S3_PROVIDER.
-    """
+def _client_kwargs() -> Dict[str, Any]:
+    """boto3/aioboto3 client kwargs for Cloudflare R2 (S3-compatible) from settings."""
     endpoint = getattr(settings, "S3_ENDPOINT", None)
     access_key = getattr(settings, "S3_ACCESS_KEY", None)
     secret = getattr(settings, "S3_SECRET_KEY", None)
@@ -28,15 +22,29 @@ def _get_s3_client():
         client_kwargs["endpoint_url"] = endpoint
     # set region if provided
     client_kwargs["region_name"] = region
+    return client_kwargs
 
+@functools.lru_cache(maxsize=1)
+def _get_s3_client():
+    """
+    Create (once per process) a boto3 S3 client configured for Cloudflare R2 (S3-compatible).
+    Expects settings.S3_ENDPOINT, S3_ACCESS_KEY, S3_SECRET_KEY, S3_REGION, S3_PROVIDER.
+    boto3 clients are thread-safe, so the cached instance is shared.
+    """
     # create client with signature version s3v4 (default)
-    return boto3.client("s3", **client_kwargs)
+    return boto3.client("s3", **_client_kwargs())
 
 def generate_presigned_put_url(bucket: str, key: str, expires_in: int = 900) -> str:
     """
     Generate presigned PUT URL for direct upload.
-    Synchronous; calling code may run it in executor (see example below).
+    Synchronous but CPU-only (no network round-trip).
     """
+    return _presign_cached(bucket, key, int(time.time() // 60), expires_in)
+
+@functools.lru_cache(maxsize=4096)
+def _presign_cached(bucket: str, key: str, minute_bucket: int, expires_in: int) -> str:
+    # repeat requests for the same key within a minute reuse the signed URL instead of
+    # re-running SigV4; a reused URL has at most 60s less validity than a fresh one
     client = _get_s3_client()
     params = {"Bucket": bucket, "Key": key, "ACL": "private"}
     # Using client.generate_presigned_url for put_object
@@ -48,7 +56,13 @@ def generate_presigned_put_url(bucket: str, key: str, expires_in: int = 900) ->
     )
     return url
 
-# Async wrapper for FastAPI usage (run blocking in threadpool)
+def generate_presigned_put_urls_bulk(bucket: str, keys: Iterable[str], expires_in: int = 900) -> Dict[str, str]:
+    """Presigned PUT URLs for many keys at once (key -> url), sharing one client and time bucket."""
+    minute_bucket = int(time.time() // 60)
+    return {key: _presign_cached(bucket, key, minute_bucket, expires_in) for key in keys}
+
+# Async wrapper for FastAPI usage. Presigning is a local HMAC over the cached
+# client's credentials (no network I/O), so it runs inline: a threadpool hop
+# would cost more than the signing itself.
 async def async_generate_presigned_put_url(bucket: str, key: str, expires_in: int = 900) -> str:
-    loop = __import__("asyncio").get_event_loop()
-    return await loop.run_in_executor(_thread_pool, generate_presigned_put_url, bucket, key, expires_in)
+    return generate_presigned_put_url(bucket, key, expires_in)
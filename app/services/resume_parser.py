@@ -17,18 +17,36 @@ Exports:
   }
 """
 
+import functools
 import re
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 from dateutil import parser as dateutil_parser  # lightweight date parsing
 import math
+import numpy as np
 
 # Useful taggers & patterns
 YEAR_RE = re.compile(r'(?P<start>\d{4})(?:\s*[-–—]\s*(?P<end>\d{4}|Present|present|Now|now|Current))?')
-PERCENT_RE = re.compile(r'(\d+(?:\.\d+)?%)')
-MONEY_RE = re.compile(r'(\$\s?\d{1,3}(?:[,\d{3}])*(?:\.\d+)?)')
-NUMBER_RE = re.compile(r'(\d+(?:\+|k|M)?(?:\.\d+)?)\b')
+# one pass per experience entry: at each position the first alternative that matches
+# wins, so "30%" is a percent and "$50,000" is money, not also a bare number
+METRIC_RE = re.compile(
+    r'(?P<percent>\d+(?:\.\d+)?%)'
+    r'|(?P<money>\$\s?\d{1,3}(?:[,\d{3}])*(?:\.\d+)?)'
+    r'|(?P<number>\d+(?:\+|k|M)?(?:\.\d+)?)\b'
+)
+# joins an entry's bullets for the single scan; no metric pattern can match across it
+_BULLET_SEP = '\x00'
 DURATION_YEARS_RE = re.compile(r'(\d+)\s+years?')
+EMAIL_RE = re.compile(r'([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)')
+PHONE_RE = re.compile(r'(\+?\d[\d\s\-\(\)]{6,}\d)')
+INLINE_SKILLS_RE = re.compile(r'(Skills[:\s]+)(.+)', re.IGNORECASE)
+HEADING_UNDERLINE_RE = re.compile(r'^[\-=_]{3,}$')
+WHITESPACE_RE = re.compile(r'\s+')
+DIGIT_RE = re.compile(r'\d')
+SPLIT_BLOCKS_RE = re.compile(r'\n{2,}')
+SPLIT_DASH_RE = re.compile(r'\s+[-—–]\s+')
+# line/bullet breaks and list separators in one class: a single split per skills section
+SKILLS_SPLIT_RE = re.compile(r'[\n\u2022\-,|;/]+')
 
 # Section heading keywords
 SECTION_ALIASES = {
@@ -40,11 +58,27 @@ SECTION_ALIASES = {
     "summary": ["summary", "professional summary", "profile", "about me"]
 }
 
+# every alias in one alternation: a single C-level scan per line instead of a Python
+# `in` probe per alias. No \b anchors, so it matches exactly when some alias is a substring.
+ALIAS_RE = re.compile('|'.join(map(re.escape, sorted({a for g in SECTION_ALIASES.values() for a in g}, key=len, reverse=True))))
+
+_HEADING_KEEP = frozenset(map(ord, 'abcdefghijklmnopqrstuvwxyz0123456789 &'))
+
+class _HeadingTable(dict):
+    """str.translate table: every character except [a-z0-9 &] becomes a space.
+    Built lazily per code point, so non-ASCII characters are covered too."""
+    def __missing__(self, c: int) -> int:
+        v = self[c] = c if c in _HEADING_KEEP else 32
+        return v
+
+_HEADING_TABLE = _HeadingTable()
+
+@functools.lru_cache(maxsize=512)
 def _normalize_heading(h: str) -> str:
+    # memoized: the same few short headings recur across every resume
     s = h.strip().lower()
-    # remove punctuation
-    s = re.sub(r'[^a-z0-9 &]', ' ', s)
-    s = re.sub(r'\s+', ' ', s).strip()
+    # remove punctuation, then collapse runs of spaces
+    s = ' '.join(s.translate(_HEADING_TABLE).split())
     for key, aliases in SECTION_ALIASES.items():
         for a in aliases:
             if a in s:
@@ -69,11 +103,11 @@ def split_into_sections(text: str) -> Dict[str, str]:
         words = line.strip().split()
         low = line.strip().lower()
         is_heading = False
-        if len(words) <= 6 and (line.strip().isupper() or any(keyword in low for group in SECTION_ALIASES.values() for keyword in group)):
+        if len(words) <= 6 and (line.strip().isupper() or ALIAS_RE.search(low) is not None):
             is_heading = True
         # also headings that end with ":" or are underlined by === or ---
         next_line = lines[idx+1] if idx+1 < len(lines) else ""
-        if line.strip().endswith(':') or re.match(r'^[\-=_]{3,}$', next_line.strip()):
+        if line.strip().endswith(':') or HEADING_UNDERLINE_RE.match(next_line.strip()):
             is_heading = True
         if is_heading:
             headings.append((idx, line.strip()))
@@ -98,22 +132,20 @@ def extract_contact(text: str) -> Dict[str, Optional[str]]:
     """
     Try to extract name, email, phone, location heuristically from top of resume.
     """
-    email_re = re.compile(r'([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)')
-    phone_re = re.compile(r'(\+?\d[\d\s\-\(\)]{6,}\d)')
     lines = [l.strip() for l in text.splitlines() if l.strip()]
     if not lines:
         return {"name": None, "email": None, "phone": None, "location": None}
     # assume header is first 8 lines
     header = "\n".join(lines[:8])
-    email = email_re.search(header)
-    phone = phone_re.search(header)
+    email = EMAIL_RE.search(header)
+    phone = PHONE_RE.search(header)
     # avoid mistaking date ranges for phone numbers
     if phone and YEAR_RE.search(phone.group(1)):
         phone = None
     # heuristic name: first non-empty line that is not email or phone
     name = None
     for l in lines[:4]:
-        if '@' in l or re.search(r'\d', l):
+        if '@' in l or DIGIT_RE.search(l):
             continue
         # skip common section headings (Experience, Skills, Education, etc.)
         if _normalize_heading(l) in SECTION_ALIASES:
@@ -125,7 +157,7 @@ def extract_contact(text: str) -> Dict[str, Optional[str]]:
     # location heuristic: last line in header without digits and not an email
     location = None
     for l in reversed(lines[:6]):
-        if '@' in l or re.search(r'\d', l):
+        if '@' in l or DIGIT_RE.search(l):
             continue
         if len(l.split()) <= 5:
             location = l
@@ -144,24 +176,19 @@ def extract_skills_from_section(skills_text: str) -> List[str]:
     if not skills_text:
         return []
     # Often skills are comma-separated or newline separated or bullet lists
-    parts = re.split(r'[\n•\u2022\-•]+', skills_text)
-    tokens = []
-    for p in parts:
-        for tok in re.split(r'[,\|;/]+', p):
-            s = tok.strip()
-            if not s:
-                continue
-            # normalize multiple spaces
-            s = re.sub(r'\s+', ' ', s)
-            tokens.append(s)
-    # dedupe preserving order
     seen = set()
     out = []
-    for t in tokens:
-        key = t.lower()
+    for tok in SKILLS_SPLIT_RE.split(skills_text):
+        s = tok.strip()
+        if not s:
+            continue
+        # normalize multiple spaces
+        s = WHITESPACE_RE.sub(' ', s)
+        # dedupe preserving order
+        key = s.lower()
         if key not in seen:
             seen.add(key)
-            out.append(t)
+            out.append(s)
     return out
 
 def split_experience_entries(exp_text: str) -> List[str]:
@@ -172,7 +199,7 @@ def split_experience_entries(exp_text: str) -> List[str]:
     if not exp_text:
         return []
     # first try splitting on double newlines
-    blocks = [b.strip() for b in re.split(r'\n{2,}', exp_text) if b.strip()]
+    blocks = [b.strip() for b in SPLIT_BLOCKS_RE.split(exp_text) if b.strip()]
     # further split blocks that contain multiple entries by seeing lines with year ranges
     entries = []
     for block in blocks:
@@ -220,7 +247,7 @@ def parse_experience_entry(text: str) -> Dict[str, any]:
         parts = header.split(' at ', 1)
         title, company = parts[0].strip(), parts[1].strip()
     elif ' - ' in header or ' — ' in header:
-        parts = re.split(r'\s+[-—–]\s+', header)
+        parts = SPLIT_DASH_RE.split(header)
         if len(parts) >= 2:
             # decide which is company by presence of 'Inc' 'LLC' or capitalized words
             left, right = parts[0].strip(), parts[1].strip()
@@ -262,16 +289,7 @@ def parse_experience_entry(text: str) -> Dict[str, any]:
             bullets.append(l)
 
     # metrics extraction
-    metrics = []
-    for b in bullets:
-        found = []
-        for m in PERCENT_RE.finditer(b):
-            found.append({'type': 'percent', 'raw': m.group(1)})
-        for m in MONEY_RE.finditer(b):
-            found.append({'type': 'money', 'raw': m.group(1)})
-        for m in NUMBER_RE.finditer(b):
-            found.append({'type': 'number', 'raw': m.group(1)})
-        metrics.extend(found)
+    metrics = [{'type': m.lastgroup, 'raw': m.group()} for m in METRIC_RE.finditer(_BULLET_SEP.join(bullets))]
 
     return {
         "company": company,
@@ -304,17 +322,20 @@ def detect_suspicious_claims(experiences: List[Dict[str, any]]) -> List[Dict[str
                 eyear = datetime.utcnow().year
             if syear <= eyear:
                 ranges.append((syear, eyear, i))
-    # check overlaps
-    ranges_sorted = sorted(ranges, key=lambda x: x[0])
-    for i in range(len(ranges_sorted)-1):
-        s1, e1, idx1 = ranges_sorted[i]
-        s2, e2, idx2 = ranges_sorted[i+1]
-        if s2 <= e1:
-            claims.append({
-                "text": f"Overlapping dates between experiences index {idx1} and {idx2}",
-                "reason": f"Ranges {s1}-{e1} and {s2}-{e2} overlap",
-                "confidence": 0.7
-            })
+    # check overlaps: sort by start (stable, so ties keep entry order) and compare
+    # each start with the previous end in one vectorised pass
+    overlaps = []
+    if len(ranges) > 1:
+        arr = np.array(ranges, dtype=np.int32)
+        arr = arr[np.argsort(arr[:, 0], kind="stable")]
+        hits = np.nonzero(arr[1:, 0] <= arr[:-1, 1])[0]
+        overlaps = [(arr[k].tolist(), arr[k + 1].tolist()) for k in hits]
+    for (s1, e1, idx1), (s2, e2, idx2) in overlaps:
+        claims.append({
+            "text": f"Overlapping dates between experiences index {idx1} and {idx2}",
+            "reason": f"Ranges {s1}-{e1} and {s2}-{e2} overlap",
+            "confidence": 0.7
+        })
     # unrealistic quick progressions (e.g., many promotions in very short time)
     # count average tenure
     if ranges:
@@ -380,7 +401,7 @@ def parse_resume_text(text: str, original_layout: Optional[Dict] = None) -> Dict
         skills = extract_skills_from_section(sections["skills"])
     else:
         # attempt to find inline "Skills:" tokens in body
-        m = re.search(r'(Skills[:\s]+)(.+)', text, flags=re.IGNORECASE)
+        m = INLINE_SKILLS_RE.search(text)
         if m:
             skills = extract_skills_from_section(m.group(2))
 
@@ -394,7 +415,7 @@ def parse_resume_text(text: str, original_layout: Optional[Dict] = None) -> Dict
     else:
         # try to heuristically extract by looking for years
         # find chunks separated by two newlines containing a year
-        candidates = re.split(r'\n{2,}', text)
+        candidates = SPLIT_BLOCKS_RE.split(text)
         for c in candidates:
             if YEAR_RE.search(c):
                 experiences.append(parse_experience_entry(c))
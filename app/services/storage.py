@@ -1,19 +1,26 @@
 # app/services/storage.py
+import asyncio
+import functools
+import logging
 import os
 import uuid
 import boto3
 from botocore.client import Config
 from botocore.exceptions import ClientError
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Set
 from fastapi import UploadFile
 import aiofiles
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Local upload directory for dev fallback
 LOCAL_UPLOAD_DIR = Path("uploads")
 LOCAL_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# local fallback copies uploads in pieces of this size
+UPLOAD_CHUNK = 1 << 20
 
 
 def _get_s3_client() -> Optional[boto3.client]:
@@ -33,55 +40,60 @@ def _get_s3_client() -> Optional[boto3.client]:
 
     if not endpoint or not access_key or not secret_key:
         return None
+    return _s3_client_for(str(endpoint), access_key, secret_key, settings.S3_REGION or None)
+
 
+@functools.lru_cache(maxsize=4)
+def _s3_client_for(endpoint: str, access_key: str, secret_key: str, region: Optional[str]):
+    # client construction loads botocore's service model and endpoint data, so build one per
+    # configuration and share it; boto3 clients are thread-safe
     # Use signature s3v4 for compatibility (Cloudflare R2 & MinIO)
-    client = boto3.client(
+    return boto3.client(
         "s3",
-        endpoint_url=str(endpoint),
+        endpoint_url=endpoint,
         aws_access_key_id=access_key,
         aws_secret_access_key=secret_key,
         config=Config(signature_version="s3v4"),
-        region_name=(settings.S3_REGION or None),
+        region_name=region,
     )
-    return client
+
+
+# buckets ensure_bucket has already found or created in this process
+_verified_buckets: Set[str] = set()
 
 
 def ensure_bucket(client: boto3.client, bucket: str) -> bool:
     """
     Ensure the bucket exists. For MinIO this may be necessary in dev.
     Returns True if bucket exists or was created successfully.
+    A bucket is checked once per process; later calls return True without a request.
     """
     if client is None:
         return False
+    if bucket in _verified_buckets:
+        return True
     try:
         # Try head_bucket (supported by S3, R2)
         client.head_bucket(Bucket=bucket)
-        return True
     except ClientError:
         # Try to create bucket (works for MinIO; R2 buckets are created in Cloudflare UI usually)
         try:
             # For some S3 providers you must not pass LocationConstraint
             client.create_bucket(Bucket=bucket)
-            return True
         except ClientError:
             # Can't create bucket (likely R2) — return False
             return False
+    _verified_buckets.add(bucket)
+    return True
 
 
 async def store_file(file: UploadFile, bucket: Optional[str] = None) -> str:
     """
     Async store: tries configured S3-compatible client, then MinIO fallback, then local filesystem.
     Returns storage key (S3 key) or local path string.
+    The upload is streamed from the spooled file (multipart for large files), never held
+    in memory whole; the blocking boto3 call runs in a thread.
     """
-    # Allow tests to monkeypatch storage at the `app.api.v1.uploads` module.
-    import sys
-    uploads_mod = sys.modules.get("app.api.v1.uploads")
-    if uploads_mod and getattr(uploads_mod, "store_file", None) and getattr(uploads_mod, "store_file") is not store_file:
-        # If uploads module provided an override (e.g. AsyncMock via monkeypatch), delegate to it.
-        override = getattr(uploads_mod, "store_file")
-        return await override(file)
-
-    contents = await file.read()
     ext = Path(file.filename).suffix
     key = f"{uuid.uuid4().hex}{ext}"
 
@@ -90,20 +102,28 @@ async def store_file(file: UploadFile, bucket: Optional[str] = None) -> str:
     s3 = _get_s3_client()
     if s3:
         try:
-            # ensure bucket exists for local MinIO dev; for R2 it will typically already exist
-            _ = ensure_bucket(s3, bucket)
-            s3.put_object(Bucket=bucket, Key=key, Body=contents, ContentType=file.content_type)
+            await file.seek(0)
+            extra = {"ContentType": file.content_type} if file.content_type else None
+            await asyncio.to_thread(_upload_stream, s3, file.file, bucket, key, extra)
             return key
         except Exception as e:
-            print("S3 upload failed, falling back. Error:", repr(e))
+            logger.warning("S3 upload failed, falling back to local storage: %r", e)
 
-    # Fallback: local filesystem
+    # Fallback: local filesystem, copied in UPLOAD_CHUNK pieces
+    await file.seek(0)
     local_path = LOCAL_UPLOAD_DIR / key
     async with aiofiles.open(local_path, "wb") as out:
-        await out.write(contents)
+        while chunk := await file.read(UPLOAD_CHUNK):
+            await out.write(chunk)
     return str(local_path)
 
 
+def _upload_stream(s3, fileobj, bucket: str, key: str, extra_args: Optional[dict]) -> None:
+    # ensure bucket exists for local MinIO dev; for R2 it will typically already exist
+    ensure_bucket(s3, bucket)
+    s3.upload_fileobj(fileobj, bucket, key, ExtraArgs=extra_args)
+
+
 def upload_bytes(key: str, data: bytes, content_type: str = "application/octet-stream", bucket: Optional[str] = None) -> str:
     """
     Blocking upload helper for bytes. Returns key or local path.
@@ -116,7 +136,7 @@ def upload_bytes(key: str, data: bytes, content_type: str = "application/octet-s
             s3.put_object(Bucket=bucket, Key=key, Body=data, ContentType=content_type)
             return key
         except Exception as e:
-            print("S3 upload_bytes failed, falling back locally. Error:", repr(e))
+            logger.warning("S3 upload_bytes failed, falling back locally: %r", e)
 
     # Local fallback
     path = LOCAL_UPLOAD_DIR / key
@@ -140,7 +160,7 @@ def generate_presigned_url(key: str, expires_in: int = 3600, bucket: Optional[st
             )
             return url
         except Exception as e:
-            print("generate_presigned_url failed:", repr(e))
+            logger.warning("generate_presigned_url failed: %r", e)
             return None
 
     # Local file fallback
@@ -161,7 +181,7 @@ def download_to_bytes(key: str, bucket: Optional[str] = None) -> Optional[bytes]
             resp = s3.get_object(Bucket=bucket, Key=key)
             return resp["Body"].read()
         except Exception as e:
-            print("S3 download failed:", repr(e))
+            logger.warning("S3 download failed: %r", e)
             return None
 
     # Local fallback
@@ -182,7 +202,7 @@ def delete_object(key: str, bucket: Optional[str] = None) -> bool:
             s3.delete_object(Bucket=bucket, Key=key)
             return True
         except Exception as e:
-            print("S3 delete failed:", repr(e))
+            logger.warning("S3 delete failed: %r", e)
             return False
 
     # Local fallback
@@ -192,5 +212,5 @@ def delete_object(key: str, bucket: Optional[str] = None) -> bool:
             p.unlink()
         return True
     except Exception as e:
-        print("Local delete failed:", repr(e))
+        logger.warning("Local delete failed: %r", e)
         return False
@@ -1,6 +1,6 @@
 # app/services/worker.py
 import asyncio
-import json
+import orjson
 import logging
 import redis.asyncio as aioredis
 from app.core.config import settings
@@ -8,20 +8,12 @@ from app.services.pipeline import run_assessment_pipeline
 
 logger = logging.getLogger(__name__)
 
-async def worker_loop():
-    url = getattr(settings, "REDIS_URL", "redis://localhost:6379/0")
-    client = aioredis.from_url(url, decode_responses=True)
-    logger.info("Worker connected to Redis, waiting for jobs...")
-    while True:
+QUEUE_KEY = "pipeline:queue"
+
+async def _run_job(payload_str: str, sem: asyncio.Semaphore) -> None:
+    async with sem:
         try:
-            # BRPOP blocks until an item is available (timeout 5s to allow clean shutdown checks)
-            res = await client.brpop("pipeline:queue", timeout=5)
-            if not res:
-                await asyncio.sleep(0.1)
-                continue
-            # res is (queue_name, payload_str)
-            payload_str = res[1]
-            payload = json.loads(payload_str)
+            payload = orjson.loads(payload_str)
             logger.info("Worker popped job: %s", payload)
             # For now, we only have resume_id/jobless flow; fetch resume/job if needed
             # We'll call run_assessment_pipeline with minimal payloads (demo)
@@ -30,6 +22,31 @@ async def worker_loop():
             # run pipeline (mock or real)
             result = await run_assessment_pipeline(job_payload, resume_payload)
             logger.info("Assessment finished: %s", result.get("assessment_id"))
+        except Exception as exc:
+            # one bad job doesn't take the rest of its batch down
+            logger.exception("Worker job failed: %s", exc)
+
+async def worker_loop():
+    url = getattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+    client = aioredis.from_url(url, decode_responses=True)
+    batch_size = settings.WORKER_BATCH_SIZE
+    sem = asyncio.Semaphore(settings.WORKER_CONCURRENCY)
+    logger.info("Worker connected to Redis, waiting for jobs...")
+    while True:
+        try:
+            # drain up to batch_size queued jobs in one round-trip (RPOP count, Redis 6.2+);
+            # when the queue is empty, long-poll with BRPOP as before
+            # (timeout 5s to allow clean shutdown checks)
+            items = await client.rpop(QUEUE_KEY, batch_size)
+            if not items:
+                res = await client.brpop(QUEUE_KEY, timeout=5)
+                if not res:
+                    await asyncio.sleep(0.1)
+                    continue
+                # res is (queue_name, payload_str)
+                items = [res[1]]
+            # pipelines are I/O-bound (LLM, Redis, Mongo): run the batch concurrently
+            await asyncio.gather(*(_run_job(item, sem) for item in items))
         except Exception as exc:
             logger.exception("Worker error: %s", exc)
             # small backoff on error
@@ -37,5 +54,8 @@ async def worker_loop():
 
 # helper to run worker in console
 if __name__ == "__main__":
+    from app.utils.eventloop import install_uvloop
+
     logging.basicConfig(level=logging.INFO)
+    install_uvloop()
     asyncio.run(worker_loop())
@@ -1,6 +1,6 @@
 # app/services/worker_streams.py
 import asyncio
-import json
+import orjson
 import logging
 import uuid
 from typing import Any, Dict, List, Tuple
@@ -74,7 +74,7 @@ async def _process_message(message_id: str, data: Dict[str, Any]) -> bool:
     """
     try:
         payload_json = data.get("payload")
-        payload = json.loads(payload_json) if payload_json else {}
+        payload = orjson.loads(payload_json) if payload_json else {}
         idempotency_key = (data.get("idempotency_key") or payload.get("idempotency_key") or "").strip()
 
         # Idempotency: mark processed keys to avoid double-processing
@@ -107,7 +107,8 @@ async def _process_message(message_id: str, data: Dict[str, Any]) -> bool:
                     return False
                 # Parse bytes into text
                 try:
-                    text, kind = extract_text_auto(obj_bytes)
+                    # PDF/DOCX parsing is CPU-bound; keep it off the event loop
+                    text, kind = await asyncio.to_thread(extract_text_auto, obj_bytes)
                     resume_payload["file_text"] = text
                     resume_payload["file_type"] = kind
                 except Exception as parse_err:
@@ -194,7 +195,7 @@ async def worker_loop(consumer_name: str = None, max_retries: int = DEFAULT_MAX_
                             # Move to DLQ with reason and acknowledge+delete
                             payload_json = parsed.get("payload")
                             try:
-                                payload_obj = json.loads(payload_json) if payload_json else {}
+                                payload_obj = orjson.loads(payload_json) if payload_json else {}
                             except Exception:
                                 payload_obj = {"_raw": payload_json}
                             await move_to_dlq(msg_id, payload_obj, reason=f"exceeded {max_retries} retries")
@@ -211,6 +212,7 @@ async def worker_loop(consumer_name: str = None, max_retries: int = DEFAULT_MAX_
 
 if __name__ == "__main__":
     import sys
+    from app.utils.eventloop import install_uvloop
 
     # Allow optional args: consumer_name and max_retries
     cname = None
@@ -224,6 +226,7 @@ if __name__ == "__main__":
             pass
 
     logger.info("Starting worker (consumer=%s, max_retries=%s)...", cname or "auto", m_retries)
+    install_uvloop()
     try:
         asyncio.run(worker_loop(consumer_name=cname, max_retries=m_retries))
     except KeyboardInterrupt:
@@ -1,6 +1,6 @@
 # app/utils/deterministic_cache.py
-import json
 import hashlib
+import orjson
 from typing import Any, Optional
 import asyncio
 
@@ -13,13 +13,36 @@ def _get_redis():
     global _redis_client
     if _redis_client is None:
         # settings.REDIS_URL is expected like redis://redis:6379/0
-        _redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        # raw bytes: values are orjson bytes and parse without a str decode in between
+        _redis_client = redis.from_url(settings.REDIS_URL, decode_responses=False)
     return _redis_client
 
+_KEY_OPTS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+def _new_hasher():
+    if settings.CACHE_KEY_HASH == "sha256":
+        return hashlib.sha256()
+    return hashlib.blake2b(digest_size=16)
+
+def key_digest(data: bytes) -> str:
+    """Hex digest used for cache keys. BLAKE2b-128 unless CACHE_KEY_HASH=sha256."""
+    h = _new_hasher()
+    h.update(data)
+    return h.hexdigest()
+
 def make_cache_key(stage: str, payload: dict, seed: int) -> str:
     # stable JSON stringify
-    s = json.dumps({"stage": stage, "payload": payload, "seed": seed}, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+    # orjson emits compact UTF-8 bytes, same as json.dumps(separators=(",", ":"), ensure_ascii=False)
+    s = orjson.dumps({"stage": stage, "payload": payload, "seed": seed}, option=_KEY_OPTS)
+    return key_digest(s)
+
+def text_hash(text: str) -> str:
+    """Digest of raw text (JD, resume) hashed as UTF-8 directly, skipping JSON escaping."""
+    return key_digest(text.encode("utf-8"))
+
+def content_hash(obj: Any) -> str:
+    """Digest of a stage output, for chaining it into the keys of the stages that consume it."""
+    return key_digest(orjson.dumps(obj, option=_KEY_OPTS))
 
 async def get_cached(stage: str, payload: dict, seed: int) -> Optional[dict]:
     client = _get_redis()
@@ -28,11 +51,11 @@ async def get_cached(stage: str, payload: dict, seed: int) -> Optional[dict]:
     if not val:
         return None
     try:
-        return json.loads(val)
+        return orjson.loads(val)
     except Exception:
         return None
 
 async def set_cached(stage: str, payload: dict, seed: int, value: dict, expire: int = 60*60*24):
     client = _get_redis()
     key = make_cache_key(stage, payload, seed)
-    await client.set(key, json.dumps(value, ensure_ascii=False), ex=expire)
+    await client.set(key, orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS), ex=expire)
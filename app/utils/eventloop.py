@@ -0,0 +1,25 @@
+# app/utils/eventloop.py
+"""
+uvloop for entrypoints that start their own loop (workers run via `python -m`).
+
+The API gets uvloop from uvicorn (`--loop uvloop`, see docker-compose.yml).
+uvloop has no Windows build, so there - or if it isn't installed - the stock
+asyncio loop is kept.
+"""
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+def install_uvloop() -> bool:
+    """Make uvloop the default event loop policy. Returns False if unavailable."""
+    if sys.platform == "win32":
+        return False
+    try:
+        import uvloop
+    except ImportError:
+        logger.info("uvloop not installed; using the default asyncio event loop")
+        return False
+    uvloop.install()
+    return True
@@ -0,0 +1,33 @@
+# app/utils/singleflight.py
+"""
+Request coalescing ("singleflight") for pure async computations.
+
+Concurrent calls with the same key share one run: the first caller starts it,
+the others await its result and get their own deep copy of it. The run is a task
+owned by the in-flight map, not by the caller that started it, so cancelling any
+caller (leader included) only stops that caller waiting.
+"""
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict
+
+
+def _finished(inflight: Dict[str, asyncio.Future], key: str, task: asyncio.Future) -> None:
+    if inflight.get(key) is task:
+        del inflight[key]
+    # mark retrieved: if every caller was cancelled nobody else reports it
+    if not task.cancelled():
+        task.exception()
+
+
+async def singleflight(inflight: Dict[str, asyncio.Future], key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """Run compute() unless a call for key is already in flight, in which case await that one."""
+    task = inflight.get(key)
+    if task is not None:
+        # followers get their own copy so callers can't mutate each other's result
+        return copy.deepcopy(await asyncio.shield(task))
+
+    task = asyncio.ensure_future(compute())
+    inflight[key] = task
+    task.add_done_callback(lambda t: _finished(inflight, key, t))
+    return await asyncio.shield(task)
@@ -1,33 +1,41 @@
 # tests/conftest.py
+import os
 import pytest
 import asyncio
 
-# motor / beanie are optional for running non-db tests. Import lazily
+# The suite runs without a Mongo server; opt in to the in-memory auth/CRUD
+# fallback before app settings are loaded.
+os.environ.setdefault("USE_INMEM_FALLBACK", "1")
+
+# pymongo async / beanie are optional for running non-db tests. Import lazily
 # and mark availability so we can skip DB fixtures if the environment
-# has an incompatible motor/pymongo combination.
+# has an incompatible pymongo/beanie combination.
 try:
-    from motor.motor_asyncio import AsyncIOMotorClient
+    from pymongo import AsyncMongoClient
     from beanie import init_beanie
-    _MOTOR_AVAILABLE = True
+    _MONGO_AVAILABLE = True
 except Exception:
-    AsyncIOMotorClient = None
+    AsyncMongoClient = None
     init_beanie = None
-    _MOTOR_AVAILABLE = False
+    _MONGO_AVAILABLE = False
 
 from app.db.documents import User, Resume, JobPosting, Assessment, History
 from app.core.config import settings
 
 @pytest.fixture(scope="session")
 def event_loop():
-    return asyncio.get_event_loop()
+    # explicit loop: get_event_loop() with no running loop is deprecated (3.12+)
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
 
 @pytest.fixture(scope="function")
 async def test_db():
-    if not _MOTOR_AVAILABLE:
-        pytest.skip("motor/beanie not available or incompatible — skipping DB tests")
+    if not _MONGO_AVAILABLE:
+        pytest.skip("pymongo async/beanie not available or incompatible — skipping DB tests")
 
-    client = AsyncIOMotorClient(settings.MONGODB_URI)
-    db = client.get_default_database()
+    client = AsyncMongoClient(settings.MONGODB_URI)
+    db = client.get_default_database(default="ats_resume")
     await init_beanie(database=db, document_models=[User, Resume, JobPosting, Assessment, History])
     # optionally drop collections to start clean
     for name in ["users", "resumes", "jobs", "assessments", "history"]:
@@ -36,4 +44,4 @@ async def test_db():
     # cleanup - drop test collections
     for name in ["users", "resumes", "jobs", "assessments", "history"]:
         await db.drop_collection(name)
-    client.close()
+    await client.close()
@@ -33,3 +33,38 @@ async def test_upload_resume_monkeypatched(monkeypatch):
         assert "resume_id" in body
         assert body["filename"] == "test_resume.pdf"
         assert body["storage_key"] == "fake-key-1234.pdf"
+
+def test_no_duplicate_route_registrations():
+    """Each method+path must be handled by exactly one endpoint."""
+    import warnings
+    app.openapi_schema = None
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        app.openapi()
+    dups = [str(w.message) for w in caught if "Duplicate Operation ID" in str(w.message)]
+    assert not dups, dups
+
+@pytest.mark.asyncio
+async def test_submit_job_returns_job_id():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        resp = await ac.post("/api/v1/submit-job", data={"text": "Data Analyst - SQL"})
+        assert resp.status_code == 200
+        assert resp.json()["job_id"].startswith("job-")
+
+@pytest.mark.asyncio
+async def test_create_assessments_bulk():
+    items = [{"job_id": "j1", "resume_id": "r1"}, {"job_id": "j2", "resume_id": "r2"}]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        resp = await ac.post("/api/v1/assessments/bulk", json=items)
+        assert resp.status_code == 200
+        body = resp.json()
+        assert len(body) == 2
+        assert len({a["id"] for a in body}) == 2
+
+def test_settings_resolved_lazily_through_cached_getter():
+    import app.core.config as config
+
+    assert "settings" not in vars(config)
+    assert config.settings is config.get_settings()
@@ -17,3 +17,119 @@ async def test_signup_and_login():
         r2 = await ac.post("/auth/login", json={"email":"smoke@test.com","password":"secret123"})
         assert r2.status_code == 200
         assert "access_token" in r2.json()
+
+@pytest.mark.asyncio
+async def test_get_current_user_caches_token(monkeypatch):
+    from fastapi.security import HTTPAuthorizationCredentials
+    import app.api.v1.auth as auth_mod
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        r = await ac.post("/auth/signup", json={"email":"cache@test.com","password":"secret123"})
+        token = r.json()["access_token"]
+
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    user = await auth_mod.get_current_user(creds)
+    assert user.email == "cache@test.com"
+
+    # second call must be served from the cache without re-decoding the token
+    def fail_decode(token):
+        raise AssertionError("token decoded despite cache hit")
+    monkeypatch.setattr(auth_mod, "decode_access_token", fail_decode)
+    again = await auth_mod.get_current_user(creds)
+    assert again.email == user.email and again.id == user.id
+
+    # callers get their own copy: mutating one doesn't leak into later requests
+    again.email = "mutated@test.com"
+    assert (await auth_mod.get_current_user(creds)).email == "cache@test.com"
+
+def test_password_hashing_argon2_and_legacy_pbkdf2():
+    import hashlib
+    from app.services.auth import hash_password, verify_password
+
+    h = hash_password("secret123")
+    assert h.startswith("$argon2id$")
+    assert verify_password("secret123", h)
+    assert not verify_password("wrong", h)
+
+    # hashes created before the argon2 switch must keep working
+    dk = hashlib.pbkdf2_hmac("sha256", b"secret123", b"abcd", 1000)
+    legacy = f"pbkdf2_sha256$1000$abcd${dk.hex()}"
+    assert verify_password("secret123", legacy)
+    assert not verify_password("wrong", legacy)
+
+    from app.services.auth import password_needs_rehash
+    assert password_needs_rehash(legacy)
+    assert not password_needs_rehash(h)
+
+def test_decode_access_token_cached(monkeypatch):
+    import app.services.auth as svc
+
+    token = svc.create_access_token("user-1")
+    assert svc.decode_access_token(token).sub == "user-1"
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("signature re-verified despite cache hit")
+    monkeypatch.setattr(svc.jwt, "decode", fail_decode)
+    assert svc.decode_access_token(token).sub == "user-1"
+
+def test_verify_password_memoizes_successful_checks(monkeypatch):
+    import app.services.auth as svc
+
+    h = svc.hash_password("memo-secret")
+    assert svc.verify_password("memo-secret", h)
+
+    def fail_verify(plain, hashed):
+        raise AssertionError("KDF re-run despite cache hit")
+    monkeypatch.setattr(svc, "_verify_uncached", fail_verify)
+    assert svc.verify_password("memo-secret", h)
+    # failures are never cached, so a wrong password still goes to the KDF
+    with pytest.raises(AssertionError):
+        svc.verify_password("wrong", h)
+
+@pytest.mark.asyncio
+async def test_get_current_user_uuid_sub_rejected_without_inmem_fallback(monkeypatch):
+    from fastapi import HTTPException
+    from fastapi.security import HTTPAuthorizationCredentials
+    import app.api.v1.auth as auth_mod
+    from app.services.auth import create_access_token
+
+    # fallback off: a non-ObjectId subject must not be resolved from the in-memory store
+    monkeypatch.setattr(auth_mod, "_INMEM_LOOKUP_ERRORS", ())
+    monkeypatch.setitem(auth_mod._INMEM_USERS, "inmem-user", {"id": "inmem-user", "email": "x@test.com"})
+
+    async def bad_id(uid):
+        raise ValueError(f"{uid} is not a valid ObjectId")
+    monkeypatch.setattr(auth_mod.User, "get", bad_id)
+
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token("inmem-user"))
+    with pytest.raises(HTTPException) as exc:
+        await auth_mod.get_current_user(creds)
+    assert exc.value.status_code == 401
+
+def test_hash_token_not_keyed_with_jwt_signing_key():
+    import hashlib
+    import hmac
+    from app.core import security
+
+    digest = security.hash_token("api-key-123")
+    assert security.verify_token_hash("api-key-123", digest)
+    assert not security.verify_token_hash("api-key-124", digest)
+    assert digest != hmac.new(security._SIGNING_KEY, b"api-key-123", hashlib.sha256).hexdigest()
+
+def test_derived_keys_are_distinct_from_signing_key():
+    from app.core.security import _SIGNING_KEY, derive_key
+
+    token_key = derive_key(b"ats-resume/token-hash/v1")
+    verify_key = derive_key(b"ats-resume/verify-cache/v1")
+    assert len({token_key, verify_key, _SIGNING_KEY}) == 3
+
+def test_security_decode_token_returns_private_claims():
+    from app.core import security
+
+    token = security.create_access_token("user-9")
+    claims = security.decode_token(token)
+    claims["sub"] = "attacker"
+    assert security.decode_token(token)["sub"] == "user-9"
+    security.decode_token(token)["sub"] = "attacker"
+    assert security.decode_token(token)["sub"] == "user-9"
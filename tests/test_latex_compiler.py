@@ -23,20 +23,13 @@ def test_compile_success(monkeypatch, latexmk_available):
             self.stdout = b"OK"
 
     def fake_run(cmd, cwd, stdout, stderr, timeout, check):
+        # simulate the PDF the real compiler would leave in the work dir
+        import pathlib
+        (pathlib.Path(cwd) / "resume.pdf").write_bytes(b"%PDF-1.4 fakepdf")
         return FakeProc()
 
     monkeypatch.setattr("subprocess.run", fake_run)
 
-    # Also mock pdf file creation by creating file in a temp dir inside compile_latex (we cannot easily capture tmpdir here)
-    # Instead, monkeypatch pathlib.Path.read_bytes to return sample bytes when reading .pdf path
-    import pathlib
-    real_read_bytes = pathlib.Path.read_bytes
-    def fake_read_bytes(self):
-        if str(self).endswith(".pdf"):
-            return b"%PDF-1.4 fakepdf"
-        return real_read_bytes(self)
-    monkeypatch.setattr("pathlib.Path.read_bytes", fake_read_bytes)
-
     success, pdf_bytes, log = compile_latex(SIMPLE_TEX, timeout=5)
     assert success
     assert pdf_bytes.startswith(b"%PDF")
@@ -51,3 +44,249 @@ def test_compile_timeout(monkeypatch):
     success, pdf, log = compile_latex(SIMPLE_TEX, timeout=1)
     assert not success
     assert "Timeout" in log
+
+@pytest.mark.asyncio
+async def test_run_compile_uses_pool_and_rejects_when_busy(monkeypatch):
+    import asyncio
+    import app.services.latex_compiler as lc
+
+    def fake_compile(tex, workdir_root, timeout):
+        return True, b"%PDF", tex
+
+    ok, pdf, log = await lc.run_compile(fake_compile, "src", None, 5)
+    assert ok and pdf == b"%PDF" and log == "src"
+
+    monkeypatch.setattr(lc, "_compile_slots", asyncio.Semaphore(0))
+    with pytest.raises(lc.CompilerBusy):
+        await lc.run_compile(fake_compile, "src", None, 5)
+
+def test_apply_patches_single_pass():
+    from app.services.latex_compiler import apply_patches
+    tex = r"\name{{{name}}} \role{{{role}}} {{unknown}}"
+    out = apply_patches(tex, {"name": "Jane", "role": "{{name}}"})
+    # values are inserted verbatim; unknown placeholders are left alone
+    assert out == r"\name{Jane} \role{{{name}}} {{unknown}}"
+    assert apply_patches(tex, None) == tex
+
+def test_load_template_cached_until_mtime_changes(monkeypatch, tmp_path):
+    import os
+    import app.services.latex_compiler as lc
+    monkeypatch.setattr(lc, "TEMPLATES_DIR", tmp_path)
+    tpl = tmp_path / "t.tex"
+    tpl.write_text("v1", encoding="utf-8")
+    assert lc.load_template("t.tex") == "v1"
+
+    tpl.write_text("v2", encoding="utf-8")
+    st = tpl.stat()
+    os.utime(tpl, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert lc.load_template("t.tex") == "v2"
+
+    with pytest.raises(FileNotFoundError):
+        lc.load_template("missing.tex")
+
+@pytest.mark.asyncio
+async def test_compile_endpoint_returns_pdf_or_legacy_json(monkeypatch):
+    import base64
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+    import app.api.v1.latex as latex_mod
+    from app.api.v1.auth import get_current_user
+
+    monkeypatch.setattr(latex_mod, "compile_latex", lambda tex, root, timeout: (True, b"%PDF-1.4 x", "compile ok"))
+    api = FastAPI()
+    api.include_router(latex_mod.router)
+    api.dependency_overrides[get_current_user] = lambda: None
+
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        r = await ac.post("/latex/compile", json={"tex_source": SIMPLE_TEX})
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/pdf"
+        assert r.content == b"%PDF-1.4 x"
+        assert base64.b64decode(r.headers["x-compile-log"]) == b"compile ok"
+
+        r2 = await ac.post("/latex/compile", json={"tex_source": SIMPLE_TEX}, headers={"Accept": "application/json"})
+        assert r2.json()["pdf_base64"] == base64.b64encode(b"%PDF-1.4 x").decode("ascii")
+
+def test_compile_rejects_oversize_pdf(monkeypatch):
+    import pathlib
+    import app.services.latex_compiler as lc
+
+    class FakeProc:
+        returncode = 0
+        stdout = b"OK"
+
+    def fake_run(cmd, cwd, **kwargs):
+        (pathlib.Path(cwd) / "resume.pdf").write_bytes(b"%PDF" + b"x" * 100)
+        return FakeProc()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    monkeypatch.setattr(lc, "MAX_PDF_BYTES", 10)
+    success, pdf, log = lc.compile_latex(SIMPLE_TEX, timeout=5)
+    assert not success and pdf == b""
+    assert "too large" in log
+
+def test_compile_uses_precompiled_format(monkeypatch):
+    import app.services.latex_compiler as lc
+
+    calls = []
+
+    class FakeProc:
+        returncode = 1
+        stdout = b"fail"
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return FakeProc()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    monkeypatch.setattr(lc, "LATEX_FORMAT", "resume")
+    lc.compile_latex(SIMPLE_TEX, timeout=5)
+    latexmk_cmd, pdflatex_cmd = calls
+    assert any(a.startswith("-pdflatex=") and "-fmt=resume" in a for a in latexmk_cmd)
+    assert "-fmt=resume" in pdflatex_cmd
+
+def test_tectonic_pool_falls_back_when_exec_fails(monkeypatch, tmp_path):
+    import app.services.latex_tectonic_pool as pool
+    from app.services.latex_compiler import DOCKER_BIN
+
+    class Proc:
+        def __init__(self, code, out=b""):
+            self.returncode = code
+            self.stdout = out
+
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd[:2])
+        if cmd[:2] == [DOCKER_BIN, "inspect"]:
+            return Proc(0, b"true latex-tectonic:latest")
+        if cmd[:2] == [DOCKER_BIN, "exec"]:
+            return Proc(125, b"Error response from daemon: container is not running")
+        return Proc(0)
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    monkeypatch.setattr(pool, "SCRATCH_DIR", tmp_path)
+    monkeypatch.setattr(pool, "_running_image", None)
+
+    assert pool.compile_in_pool(SIMPLE_TEX, "latex-tectonic:latest", 5) is None
+    assert [DOCKER_BIN, "exec"] in calls
+    # the broken container is forgotten so the next compile re-checks it
+    assert pool._running_image is None
+    # job dirs are removed in the background
+    from app.services.latex_compiler import wait_for_cleanups
+    wait_for_cleanups(5)
+    assert list(tmp_path.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_run_subprocess_returns_output_and_kills_on_timeout():
+    import asyncio
+    import sys
+    from app.services.latex_compiler import run_subprocess
+
+    code, out = await run_subprocess([sys.executable, "-c", "print('hi')"], timeout=10)
+    assert code == 0 and out.strip() == b"hi"
+
+    with pytest.raises(asyncio.TimeoutError):
+        await run_subprocess([sys.executable, "-c", "import time; time.sleep(10)"], timeout=0.2)
+
+def test_tectonic_host_binary_skips_docker(monkeypatch):
+    import pathlib
+    import app.services.latex_tectonic_runner as runner
+
+    calls = []
+
+    class FakeProc:
+        returncode = 0
+        stdout = b"ok"
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        outdir = pathlib.Path(cmd[cmd.index("--outdir") + 1])
+        (outdir / "resume.pdf").write_bytes(b"%PDF-1.4 host")
+        return FakeProc()
+
+    monkeypatch.setattr(runner, "_host_tectonic", lambda: "/usr/bin/tectonic")
+    monkeypatch.setattr("subprocess.run", fake_run)
+    ok, pdf, log = runner.compile_tex_with_tectonic(SIMPLE_TEX, timeout=5)
+    assert ok and pdf == b"%PDF-1.4 host"
+    assert len(calls) == 1 and calls[0][0] == "/usr/bin/tectonic"
+
+@pytest.mark.asyncio
+async def test_tectonic_endpoint_streams_pdf_and_cleans_up(monkeypatch, tmp_path):
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+    import app.api.v1.latex_tectonic as tect_mod
+    from app.api.v1.auth import get_current_user
+
+    workdir = tmp_path / "job"
+    workdir.mkdir()
+    pdf = workdir / "resume.pdf"
+    pdf.write_bytes(b"%PDF-1.4 tectonic")
+
+    async def fake_compile(tex, image, timeout):
+        return True, pdf, "ok"
+
+    monkeypatch.setattr(tect_mod, "compile_tex_to_pdf_file", fake_compile)
+    api = FastAPI()
+    api.include_router(tect_mod.router)
+    api.dependency_overrides[get_current_user] = lambda: None
+
+    transport = ASGITransport(app=api)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        r = await ac.post("/latex/compile-tectonic", json={"tex_source": SIMPLE_TEX})
+    assert r.status_code == 200
+    assert r.content == b"%PDF-1.4 tectonic"
+    assert r.headers["content-disposition"].startswith("inline")
+    assert not workdir.exists()
+
+def test_tectonic_warm_up_pulls_missing_image_then_compiles(monkeypatch):
+    import app.services.latex_tectonic_runner as runner
+
+    calls = []
+
+    class Proc:
+        def __init__(self, code):
+            self.returncode = code
+            self.stdout = b""
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd[1:3])
+        return Proc(1 if cmd[1:3] == ["image", "inspect"] else 0)
+
+    compiled = []
+    monkeypatch.setattr("subprocess.run", fake_run)
+    monkeypatch.setattr(runner, "_host_tectonic", lambda: None)
+    monkeypatch.setattr(runner, "compile_tex_with_tectonic", lambda tex, image, timeout: (compiled.append(image), (True, b"%PDF", ""))[1])
+    assert runner.warm_up_tectonic("latex-tectonic:test", timeout=5)
+    assert calls == [["image", "inspect"], ["pull", "latex-tectonic:test"]]
+    assert compiled == ["latex-tectonic:test"]
+
+@pytest.mark.asyncio
+async def test_run_subprocess_to_log_file_and_read_tail(tmp_path):
+    import sys
+    from app.services.latex_compiler import read_log_tail, run_subprocess
+
+    log = tmp_path / "build.log"
+    code, out = await run_subprocess([sys.executable, "-c", "print('x' * 10000 + 'END')"], timeout=10, log_path=log)
+    assert code == 0 and out == b""
+    tail = read_log_tail(log, limit=16)
+    assert tail.rstrip().endswith("END") and len(tail) <= 16
+    assert read_log_tail(tmp_path / "missing.log") == ""
+
+def test_default_workdir_root_skips_full_shm(monkeypatch):
+    import collections
+    import app.services.latex_compiler as lc
+
+    usage = collections.namedtuple("usage", "total used free")
+    monkeypatch.setattr(lc.os.path, "isdir", lambda p: True)
+    monkeypatch.setattr(lc.os, "access", lambda p, mode: True)
+    monkeypatch.setattr(lc.shutil, "disk_usage", lambda p: usage(64 << 20, 60 << 20, 4 << 20))
+    lc._default_workdir_root.cache_clear()
+    try:
+        assert lc._default_workdir_root() is None
+        monkeypatch.setattr(lc.shutil, "disk_usage", lambda p: usage(1 << 30, 0, 1 << 30))
+        lc._default_workdir_root.cache_clear()
+        assert lc._default_workdir_root() == "/dev/shm"
+    finally:
+        lc._default_workdir_root.cache_clear()
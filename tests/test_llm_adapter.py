@@ -35,3 +35,172 @@ async def test_http_adapter_fallback(monkeypatch, tmp_path):
 
     res = await llm_adapter.run_stage("D_MATCHER_SCORER", {"jd":{},"resume":{}}, seed=2)
     assert isinstance(res, dict)
+
+@pytest.mark.asyncio
+async def test_run_stage_served_from_llm_cache(monkeypatch):
+    from app.services import llm_adapter, llm_cache
+    monkeypatch.setattr(llm_cache, "aioredis", None)  # local tier only
+    llm_cache.clear_local()
+
+    calls = []
+
+    class FakeAdapter:
+        @staticmethod
+        async def run_stage(stage, payload, seed=42):
+            calls.append(stage)
+            return {"stage": stage, "n": len(calls)}
+
+    monkeypatch.setattr(llm_adapter, "_adapter", FakeAdapter)
+    monkeypatch.setattr(llm_adapter, "_CACHE_TTL", 60)
+    first = await llm_adapter.run_stage("E_RECOMMEND", {"score": 1}, seed=3)
+    second = await llm_adapter.run_stage("E_RECOMMEND", {"score": 1}, seed=3)
+    assert first == second == {"stage": "E_RECOMMEND", "n": 1}
+    await llm_adapter.run_stage("E_RECOMMEND", {"score": 1}, seed=4)
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_run_stage_collapses_concurrent_identical_calls(monkeypatch):
+    from app.services import llm_adapter
+
+    calls = []
+
+    class SlowAdapter:
+        @staticmethod
+        async def run_stage(stage, payload, seed=42):
+            calls.append(stage)
+            await asyncio.sleep(0.05)
+            return {"stage": stage, "tags": []}
+
+    monkeypatch.setattr(llm_adapter, "_adapter", SlowAdapter)
+    monkeypatch.setattr(llm_adapter, "_CACHE_TTL", 0)
+    results = await asyncio.gather(*(llm_adapter.run_stage("B_JD_EXTRACT", {"jd": "x"}, seed=1) for _ in range(5)))
+    assert len(calls) == 1
+    assert all(r == {"stage": "B_JD_EXTRACT", "tags": []} for r in results)
+    # each caller owns its result
+    results[0]["tags"].append("mutated")
+    assert results[1]["tags"] == []
+    assert llm_adapter._INFLIGHT == {}
+
+@pytest.mark.asyncio
+async def test_run_stage_batch_and_batch_window(monkeypatch):
+    from app.services import llm_adapter, llm_cache
+    monkeypatch.setattr(llm_cache, "aioredis", None)
+    llm_cache.clear_local()
+
+    batches = []
+
+    class BatchAdapter:
+        @staticmethod
+        async def run_stage(stage, payload, seed=42):
+            raise AssertionError("single call made despite batch support")
+
+        @staticmethod
+        async def run_stage_batch(stage, payloads, seed=42):
+            batches.append([p["i"] for p in payloads])
+            return [{"i": p["i"]} for p in payloads]
+
+    monkeypatch.setattr(llm_adapter, "_adapter", BatchAdapter)
+    monkeypatch.setattr(llm_adapter, "_CACHE_TTL", 60)
+    out = await llm_adapter.run_stage_batch("D_MATCHER_SCORER", [{"i": 1}, {"i": 2}, {"i": 1}], seed=5)
+    assert out == [{"i": 1}, {"i": 2}, {"i": 1}]
+    assert batches == [[1, 2]]
+    # now cached: only the new input is sent
+    await llm_adapter.run_stage_batch("D_MATCHER_SCORER", [{"i": 2}, {"i": 3}], seed=5)
+    assert batches[-1] == [3]
+
+    # single calls within the window are coalesced into one batch
+    monkeypatch.setattr(llm_adapter, "_CACHE_TTL", 0)
+    monkeypatch.setattr(llm_adapter, "_BATCH_WINDOW", 0.02)
+    results = await asyncio.gather(*(llm_adapter.run_stage("D_MATCHER_SCORER", {"i": i}, seed=6) for i in range(4)))
+    assert [r["i"] for r in results] == [0, 1, 2, 3]
+    assert batches[-1] == [0, 1, 2, 3]
+
+@pytest.mark.asyncio
+async def test_http_adapter_retries_after_429_and_opens_breaker(monkeypatch):
+    import httpx
+    from app.services.llm_adapters import http_adapter
+
+    statuses = [429, 200]
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status = statuses.pop(0) if statuses else 503
+        if status == 429:
+            return httpx.Response(429, headers={"Retry-After": "3"})
+        if status == 200:
+            return httpx.Response(200, json={"ok": True})
+        return httpx.Response(status)
+
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(http_adapter.settings, "LLM_HTTP_URL", "https://llm.test/run")
+    monkeypatch.setattr(http_adapter.settings, "LLM_API_KEY", "sk-test")
+    # the shared client is built by _client() (with its auth header), on the mock transport
+    monkeypatch.setattr(http_adapter, "_CLIENT", None)
+    real_async_client = httpx.AsyncClient
+    monkeypatch.setattr(http_adapter.httpx, "AsyncClient", lambda **kw: real_async_client(transport=httpx.MockTransport(handler), **kw))
+    monkeypatch.setattr(http_adapter.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(http_adapter, "RETRIES", 1)
+    monkeypatch.setattr(http_adapter, "BREAKER_THRESHOLD", 2)
+    monkeypatch.setattr(http_adapter, "_consecutive_failures", 0)
+    monkeypatch.setattr(http_adapter, "_open_until", 0.0)
+
+    assert await http_adapter.run_stage("E_RECOMMEND", {"score": 1}) == {"ok": True}
+    assert len(requests) == 2 and sleeps == [3.0]
+    assert all(r.headers["Authorization"] == "Bearer sk-test" for r in requests)
+
+    # a Retry-After beyond the backoff cap is not waited out: the call fails at once
+    statuses[:] = [429]
+    monkeypatch.setattr(http_adapter, "BACKOFF_CAP", 2.0)
+    sleeps.clear()
+    with pytest.raises(httpx.HTTPStatusError):
+        await http_adapter.run_stage("E_RECOMMEND", {"score": 2})
+    assert sleeps == []
+    monkeypatch.setattr(http_adapter, "_consecutive_failures", 0)
+
+    # every later call gets 503: two failed calls open the breaker
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await http_adapter.run_stage_batch("E_RECOMMEND", [{"score": 1}])
+    sent = len(requests)
+    with pytest.raises(RuntimeError, match="circuit open"):
+        await http_adapter.run_stage("E_RECOMMEND", {"score": 1})
+    assert len(requests) == sent
+
+@pytest.mark.asyncio
+async def test_singleflight_cancelled_leader_does_not_cancel_followers():
+    from app.utils.singleflight import singleflight
+
+    inflight = {}
+    started = asyncio.Event()
+
+    async def compute():
+        started.set()
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    leader = asyncio.ensure_future(singleflight(inflight, "k", compute))
+    await started.wait()
+    follower = asyncio.ensure_future(singleflight(inflight, "k", compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == {"ok": True}
+    assert leader.cancelled()
+    assert inflight == {}
+
+@pytest.mark.asyncio
+async def test_llm_cache_local_tier_expires_with_ttl(monkeypatch):
+    from cachetools import TTLCache
+    from app.services import llm_cache
+
+    now = [0.0]
+    monkeypatch.setattr(llm_cache, "aioredis", None)
+    monkeypatch.setattr(llm_cache, "_local", TTLCache(maxsize=8, ttl=10, timer=lambda: now[0]))
+    await llm_cache.set("llm:k", b"v")
+    assert await llm_cache.get("llm:k") == b"v"
+    now[0] = 11
+    assert await llm_cache.get("llm:k") is None
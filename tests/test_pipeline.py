@@ -1,5 +1,6 @@
 # tests/test_pipeline.py
 import pytest
+from cachetools import TTLCache
 from httpx import AsyncClient, ASGITransport
 from app.main import app
 from app.services.llm_mock import run_stage
@@ -22,3 +23,265 @@ async def test_pipeline_runs_and_is_deterministic(monkeypatch):
         assert data1["stages"] == data2["stages"]
         # final score consistent
         assert data1["final_score"] == data2["final_score"]
+
+@pytest.mark.asyncio
+async def test_pipeline_stage_cache_keys_cover_only_stage_inputs(monkeypatch):
+    import app.services.pipeline as pipeline
+
+    store = {}
+    calls = {"get_many": 0, "get": 0, "set_many": 0}
+
+    class FakeCache:
+        async def get_many(self, keys):
+            calls["get_many"] += 1
+            return {k: store[k] for k in keys if k in store}
+
+        async def get(self, key):
+            calls["get"] += 1
+            return store.get(key)
+
+        async def set_many(self, items):
+            calls["set_many"] += 1
+            store.update(items)
+
+    monkeypatch.setattr(pipeline, "cache", FakeCache())
+    job_payload = {"raw_text": "SQL Power BI"}
+    resume_payload = {"file_text": "SQL and Power BI"}
+    first = await pipeline.run_assessment_pipeline(job_payload, resume_payload, seed=7)
+    assert len(store) == len(pipeline.STAGES)
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("stage recomputed despite cache hit")
+
+    monkeypatch.setattr(pipeline, "run_stage", no_llm)
+    # go to Redis (the fake) rather than the in-process L1
+    pipeline._L1.clear()
+    # resume metadata the stages never read doesn't change any key
+    second = await pipeline.run_assessment_pipeline(job_payload, {**resume_payload, "uploaded_at": "2024-01-01"}, seed=7)
+    assert second["stages"] == first["stages"]
+    assert len(store) == len(pipeline.STAGES)
+    # A and C in one MGET per run; B, D, E, F looked up once their inputs are known;
+    # the first run's six results written back in one batch, nothing new to write after
+    assert calls == {"get_many": 2, "get": 8, "set_many": 1}
+
+    # a different resume re-keys C and everything downstream of it, but not A or B
+    computed = []
+
+    async def record(stage_name, payload, seed=42):
+        computed.append(stage_name)
+        return run_stage(stage_name, payload, seed=seed)
+
+    monkeypatch.setattr(pipeline, "run_stage", record)
+    await pipeline.run_assessment_pipeline(job_payload, {"file_text": "Python and Tableau"}, seed=7)
+    assert computed == ["D_MATCHER_SCORER", "E_RECOMMEND", "F_LATEX_ADAPT"]
+
+@pytest.mark.asyncio
+async def test_pipeline_repeat_lookups_served_from_l1(monkeypatch):
+    import app.services.pipeline as pipeline
+
+    class DownCache:
+        async def get_many(self, keys):
+            raise ConnectionError("redis down")
+
+        async def get(self, key):
+            raise ConnectionError("redis down")
+
+        async def set_many(self, items):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(pipeline, "cache", DownCache())
+    monkeypatch.setattr(pipeline, "_L1", TTLCache(maxsize=pipeline._L1_MAX, ttl=60))
+    job_payload = {"raw_text": "Data Analyst SQL"}
+    resume_payload = {"file_text": "SQL dashboards"}
+    first = await pipeline.run_assessment_pipeline(job_payload, resume_payload, seed=3)
+    assert len(pipeline._L1) == len(pipeline.STAGES)
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("stage recomputed despite L1 hit")
+
+    monkeypatch.setattr(pipeline, "run_stage", no_llm)
+    second = await pipeline.run_assessment_pipeline(job_payload, resume_payload, seed=3)
+    assert second["stages"] == first["stages"]
+
+    # bounded, least recently used out first, and entries expire like their Redis copies
+    now = [0.0]
+    monkeypatch.setattr(pipeline, "_L1", TTLCache(maxsize=2, ttl=10, timer=lambda: now[0]))
+    for k in ("a", "b", "c"):
+        pipeline._l1_put(k, {"v": k})
+    assert pipeline._l1_get("a") is None and pipeline._l1_get("c") == {"v": "c"}
+    now[0] = 11
+    assert pipeline._l1_get("c") is None
+
+@pytest.mark.asyncio
+async def test_concurrent_pipelines_share_stage_computation(monkeypatch):
+    import asyncio
+    import app.services.pipeline as pipeline
+
+    class EmptyCache:
+        async def get_many(self, keys):
+            return {}
+
+        async def get(self, key):
+            return None
+
+        async def set_many(self, items):
+            pass
+
+    monkeypatch.setattr(pipeline, "cache", EmptyCache())
+    monkeypatch.setattr(pipeline, "_L1", TTLCache(maxsize=pipeline._L1_MAX, ttl=60))
+    calls = []
+
+    async def slow_stage(stage_name, payload, seed=42):
+        calls.append(stage_name)
+        await asyncio.sleep(0.01)
+        return run_stage(stage_name, payload, seed=seed)
+
+    monkeypatch.setattr(pipeline, "run_stage", slow_stage)
+    job_payload = {"raw_text": "Hot JD: SQL Python"}
+    first, second = await asyncio.gather(
+        pipeline.run_assessment_pipeline(job_payload, {"file_text": "SQL"}, seed=5),
+        pipeline.run_assessment_pipeline(job_payload, {"file_text": "SQL"}, seed=5),
+    )
+    assert first["stages"] == second["stages"]
+    assert sorted(calls) == sorted(pipeline.STAGES[:2] + pipeline.STAGES[3:])
+    assert pipeline._INFLIGHT == {}
+
+@pytest.mark.asyncio
+async def test_large_stage_inputs_keyed_off_loop(monkeypatch):
+    import asyncio
+    import app.services.pipeline as pipeline
+
+    offloaded = []
+    real_to_thread = asyncio.to_thread
+
+    async def spy_to_thread(func, *args, **kwargs):
+        offloaded.append(getattr(func, "__name__", func))
+        return await real_to_thread(func, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline.asyncio, "to_thread", spy_to_thread)
+    monkeypatch.setattr(pipeline, "_OFFLOAD_KEY_BYTES", 1024)
+    job_payload = {"raw_text": "SQL " * 1000}
+    resume_payload = {"file_text": "Python"}
+    await pipeline.run_assessment_pipeline(job_payload, resume_payload, seed=11)
+    # only the big JD's key moves to a thread; a small resume is parsed on one too
+    assert offloaded == ["stage_key", "parse_resume_text"]
+
+@pytest.mark.asyncio
+async def test_large_resume_parsed_in_process_pool(monkeypatch):
+    import app.services.pipeline as pipeline
+    from app.services.resume_parser import parse_resume_text
+
+    monkeypatch.setattr(pipeline, "_RESUME_POOL_WORKERS", 1)
+    text = "Skills: SQL, Python\n" + "Built dashboards in Power BI for 5 teams.\n" * 500
+    assert len(text) > pipeline._RESUME_POOL_MIN_CHARS
+    try:
+        parsed = await pipeline._parse_resume_off_loop(text, {})
+        assert pipeline._RESUME_POOL is not None
+        assert pipeline._RESUME_POOL._mp_context.get_start_method() == "forkserver"
+    finally:
+        pipeline.shutdown_resume_pool()
+    assert parsed == parse_resume_text(text, {})
+
+@pytest.mark.asyncio
+async def test_same_resume_against_new_jd_is_not_reparsed(monkeypatch):
+    import app.services.pipeline as pipeline
+
+    parses = []
+    real_parse = pipeline.parse_resume_text
+
+    def counting_parse(text, original_layout=None):
+        parses.append(text)
+        return real_parse(text, original_layout)
+
+    monkeypatch.setattr(pipeline, "parse_resume_text", counting_parse)
+    monkeypatch.setattr(pipeline, "_L1", TTLCache(maxsize=pipeline._L1_MAX, ttl=60))
+    resume_payload = {"file_text": "Analyst with SQL and Looker"}
+    await pipeline.run_assessment_pipeline({"raw_text": "Data Analyst"}, resume_payload, seed=13)
+    await pipeline.run_assessment_pipeline({"raw_text": "BI Engineer, Looker"}, resume_payload, seed=13)
+    assert parses == [resume_payload["file_text"]]
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_assessment_with_stage_references(monkeypatch):
+    import app.services.pipeline as pipeline
+
+    inserted = []
+    stage_docs = {}
+
+    class FakeStages:
+        async def bulk_write(self, ops, ordered):
+            for op in ops:
+                stage_docs.setdefault(op._filter["_id"], op._doc["$setOnInsert"]["output"])
+
+        def find(self, query):
+            async def docs():
+                for key in query["_id"]["$in"]:
+                    if key in stage_docs:
+                        yield {"_id": key, "output": stage_docs[key]}
+            return docs()
+
+    class FakeAssessments:
+        database = {pipeline.STAGE_OUTPUTS_COLLECTION: FakeStages()}
+
+        async def insert_one(self, doc):
+            inserted.append(doc)
+
+    monkeypatch.setattr(pipeline.Assessment, "get_pymongo_collection", classmethod(lambda cls: FakeAssessments()))
+    result = await pipeline.run_assessment_pipeline(
+        {"job_id": "j1", "raw_text": "SQL"}, {"resume_id": "r1", "user_id": "u1", "file_text": "SQL"}, seed=17
+    )
+    (doc,) = inserted
+    assert str(doc["_id"]) == result["assessment_id"]
+    assert (doc["user_id"], doc["job_id"], doc["resume_id"]) == ("u1", "j1", "r1")
+    assert doc["score"] == result["final_score"]
+    # the document references stage outputs instead of embedding them
+    assert "stages" not in doc["results_json"]
+    hashes = doc["results_json"]["stage_hashes"]
+    assert set(hashes) == set(pipeline.STAGES)
+    assert set(stage_docs) == set(hashes.values())
+
+    # rehydrated by content hash only: whatever the input-keyed stage cache holds
+    # now (say, a later recompute) can't leak into this assessment
+    class StaleCache:
+        async def get_many(self, keys):
+            return {k: {"score": -1} for k in keys}
+
+    monkeypatch.setattr(pipeline, "cache", StaleCache())
+    monkeypatch.setattr(pipeline, "_L1", TTLCache(maxsize=pipeline._L1_MAX, ttl=60))
+    assert await pipeline.load_stage_outputs(hashes) == result["stages"]
+
+@pytest.mark.asyncio
+async def test_assess_batch_runs_jd_stages_once(monkeypatch):
+    import app.services.pipeline as pipeline
+
+    monkeypatch.setattr(pipeline, "_L1", TTLCache(maxsize=pipeline._L1_MAX, ttl=60))
+    calls = []
+    real_run_stage = pipeline.run_stage
+
+    async def counting(stage_name, payload, seed=42):
+        calls.append(stage_name)
+        return await real_run_stage(stage_name, payload, seed=seed)
+
+    monkeypatch.setattr(pipeline, "run_stage", counting)
+    job_payload = {"raw_text": "Batch JD: SQL, Tableau, Python"}
+    resumes = [{"file_text": "SQL and Tableau"}, {"file_text": "Python and Airflow"}]
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        r = await client.post("/api/v1/assess_batch", json={"job_payload": job_payload, "resume_payloads": resumes, "seed": 19})
+    assert r.status_code == 200
+    batch = r.json()
+    assert len(batch) == 2
+    assert calls.count("A_JD_NORMALIZER") == 1 and calls.count("B_JD_EXTRACT") == 1
+    assert calls.count("D_MATCHER_SCORER") == 2
+    # same outputs as assessing each resume on its own
+    single = await pipeline.run_assessment_pipeline(job_payload, resumes[1], seed=19)
+    assert batch[1]["stages"] == single["stages"]
+
+@pytest.mark.asyncio
+async def test_assess_batch_rejects_oversized_batches():
+    from app.core.config import settings
+
+    resumes = [{"file_text": "SQL"}] * (settings.ASSESS_BATCH_MAX + 1)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        r = await client.post("/api/v1/assess_batch", json={"job_payload": {"raw_text": "SQL"}, "resume_payloads": resumes})
+    assert r.status_code == 422
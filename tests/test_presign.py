@@ -1,5 +1,5 @@
 import pytest
-from app.services.r2_presign import async_generate_presigned_put_url
+from app.services.r2_presign import async_generate_presigned_put_url, generate_presigned_put_urls_bulk, _get_s3_client, _presign_cached
 
 
 @pytest.mark.asyncio
@@ -15,6 +15,38 @@ async def test_presign(monkeypatch):
 		return DummyClient()
 
 	monkeypatch.setattr("boto3.client", fake_boto_client)
+	# the client is cached per process; drop it so the fake is picked up
+	_get_s3_client.cache_clear()
+	_presign_cached.cache_clear()
 
 	url = await async_generate_presigned_put_url("my-bucket", "my-key")
-	assert url == "https://example.com/fake-presign"
\ No newline at end of file
+	assert url == "https://example.com/fake-presign"
+	_get_s3_client.cache_clear()
+	_presign_cached.cache_clear()
+
+
+def test_presign_bulk_reuses_signatures_within_a_minute(monkeypatch):
+	calls = []
+
+	class DummyClient:
+		def generate_presigned_url(self, method, Params, ExpiresIn, HttpMethod):
+			calls.append(Params["Key"])
+			return f"https://example.com/{Params['Key']}?n={len(calls)}"
+
+	monkeypatch.setattr("boto3.client", lambda name, **kwargs: DummyClient())
+	monkeypatch.setattr("time.time", lambda: 600.0)
+	_get_s3_client.cache_clear()
+	_presign_cached.cache_clear()
+	try:
+		urls = generate_presigned_put_urls_bulk("b", ["k1", "k2", "k1"])
+		assert urls == {"k1": "https://example.com/k1?n=1", "k2": "https://example.com/k2?n=2"}
+		# same minute: served from cache
+		generate_presigned_put_urls_bulk("b", ["k1"])
+		assert calls == ["k1", "k2"]
+		# next minute: re-signed
+		monkeypatch.setattr("time.time", lambda: 660.0)
+		generate_presigned_put_urls_bulk("b", ["k1"])
+		assert calls == ["k1", "k2", "k1"]
+	finally:
+		_get_s3_client.cache_clear()
+		_presign_cached.cache_clear()
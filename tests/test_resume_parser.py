@@ -50,3 +50,41 @@ def test_suspicious_overlap():
     parsed = parse_resume_text(text)
     suspicious = parsed["suspicious_claims"]
     assert any("Overlapping" in s["text"] for s in suspicious)
+
+def test_suspicious_overlaps_follow_sorted_start_order():
+    from app.services.resume_parser import detect_suspicious_claims
+    experiences = [
+        {"start": "2015", "end": "2017"},
+        {"start": "2010", "end": "2012"},
+        {"start": "2016", "end": "2019"},
+        {"start": "2011", "end": "2011"},
+        {"start": "abc"},
+        {"start": "2015", "end": "2014"},
+    ]
+    overlaps = [c["text"] for c in detect_suspicious_claims(experiences) if c["text"].startswith("Overlapping")]
+    assert overlaps == [
+        "Overlapping dates between experiences index 1 and 3",
+        "Overlapping dates between experiences index 0 and 2",
+    ]
+    assert detect_suspicious_claims([{"start": "2015", "end": "2016"}]) == []
+
+def test_metrics_single_pass_no_double_counting():
+    from app.services.resume_parser import parse_experience_entry
+    entry = parse_experience_entry("Analyst at Acme\n- Cut costs 20% saving $50,000\n- Built 10+ dashboards for 1.5 teams")
+    assert entry["metrics"] == [
+        {"type": "percent", "raw": "20%"},
+        {"type": "money", "raw": "$50,000"},
+        {"type": "number", "raw": "10"},
+        {"type": "number", "raw": "1.5"},
+    ]
+
+def test_normalize_heading_strips_punctuation_and_non_ascii():
+    from app.services.resume_parser import _normalize_heading
+    assert _normalize_heading("  WORK -- Experience:\t") == "experience"
+    assert _normalize_heading("Tools & Café!!") == "tools & caf"
+    assert _normalize_heading("---") == ""
+
+def test_extract_skills_single_split_dedupes_in_order():
+    from app.services.resume_parser import extract_skills_from_section
+    text = "• SQL, Power  BI | Python\n- sql; Tableau/Excel\n• python"
+    assert extract_skills_from_section(text) == ["SQL", "Power BI", "Python", "Tableau", "Excel"]
@@ -10,8 +10,11 @@ class DummyS3Client:
     def __init__(self):
         self.objects = {}
         self.buckets = set()
+        self.streamed = []
+        self.head_calls = 0
 
     def head_bucket(self, Bucket):
+        self.head_calls += 1
         if Bucket not in self.buckets:
             raise Exception("NoSuchBucket")
 
@@ -25,6 +28,11 @@ class DummyS3Client:
         self.objects[(Bucket, Key)] = Body
         return {"ETag": '"dummy-etag"'}
 
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None):
+        # store_file streams the upload; record the bytes it read
+        self.streamed.append((Bucket, Key, ExtraArgs))
+        self.objects[(Bucket, Key)] = Fileobj.read()
+
     def generate_presigned_url(self, ClientMethod, Params, ExpiresIn):
         bucket = Params["Bucket"]
         key = Params["Key"]
@@ -53,10 +61,21 @@ async def test_store_file_calls_s3_put(monkeypatch):
     dummy.create_bucket("unit-test-bucket")
 
     # monkeypatch boto3.client used in storage._get_s3_client
+    clients_built = []
+
     def fake_boto3_client(*args, **kwargs):
+        clients_built.append(args)
         return dummy
 
     monkeypatch.setattr("app.services.storage.boto3.client", fake_boto3_client)
+    # _get_s3_client returns None (local fallback) unless an endpoint and keys are set
+    monkeypatch.setattr(storage_mod.settings, "S3_PROVIDER", None)
+    monkeypatch.setattr(storage_mod.settings, "S3_ENDPOINT", "http://s3.unit-test")
+    monkeypatch.setattr(storage_mod.settings, "S3_ACCESS_KEY", "test-access")
+    monkeypatch.setattr(storage_mod.settings, "S3_SECRET_KEY", "test-secret")
+    # the client and verified buckets are cached per process; start clean so the fake is used
+    storage_mod._s3_client_for.cache_clear()
+    storage_mod._verified_buckets.clear()
 
     # create a fake UploadFile with correct FastAPI constructor
     content = b"hello unit test"
@@ -70,8 +89,16 @@ async def test_store_file_calls_s3_put(monkeypatch):
 
     # verify that the object was stored in dummy client
     assert ("unit-test-bucket", key) in dummy.objects
-    # dummy stored raw bytes
+    # dummy stored raw bytes, streamed from the upload's file object
     assert dummy.objects[("unit-test-bucket", key)] == content
+    assert dummy.streamed == [("unit-test-bucket", key, {"ContentType": "text/plain"})]
+
+    # a second upload reuses the shared client and skips the bucket check
+    second = UploadFile(file=BytesIO(b"again"), filename="again.txt", size=5, headers=headers)
+    key2 = await storage_mod.store_file(second, bucket="unit-test-bucket")
+    assert dummy.objects[("unit-test-bucket", key2)] == b"again"
+    assert len(clients_built) == 1
+    assert dummy.head_calls == 1
 
     # presigned url
     url = storage_mod.generate_presigned_url(key, expires_in=60, bucket="unit-test-bucket")
@@ -0,0 +1,40 @@
+# tests/test_worker.py
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+import orjson
+
+from app.services import worker
+
+
+@pytest.mark.asyncio
+async def test_worker_loop_runs_popped_batch_concurrently(monkeypatch):
+    jobs = [orjson.dumps({"raw_text": f"jd {i}", "file_text": "SQL"}).decode() for i in range(3)]
+    fake_client = AsyncMock()
+    fake_client.rpop = AsyncMock(side_effect=[jobs, None, None, None])
+    fake_client.brpop = AsyncMock(return_value=None)
+    monkeypatch.setattr(worker.aioredis, "from_url", lambda url, decode_responses: fake_client)
+
+    running, peak, seen = 0, 0, []
+
+    async def fake_pipeline(job_payload, resume_payload):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        seen.append(job_payload["raw_text"])
+        return {"assessment_id": None}
+
+    monkeypatch.setattr(worker, "run_assessment_pipeline", fake_pipeline)
+    task = asyncio.create_task(worker.worker_loop())
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert sorted(seen) == ["jd 0", "jd 1", "jd 2"]
+    assert peak == 3
+    fake_client.rpop.assert_any_call(worker.QUEUE_KEY, worker.settings.WORKER_BATCH_SIZE)
+    # empty queue falls back to the blocking pop
+    assert fake_client.brpop.called
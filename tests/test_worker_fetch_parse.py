@@ -66,3 +66,90 @@ async def test_worker_fetches_and_parses_then_runs_pipeline(monkeypatch):
     # verify pipeline was called with parsed text (even if partially processed)
     # xreadgroup should have been called to fetch the message
     assert fake_client.xreadgroup.called
+
+@pytest.mark.asyncio
+async def test_get_object_bytes_fetches_large_objects_in_ranged_parts(monkeypatch):
+    from app.services import r2_fetch
+
+    data = bytes(range(256)) * 40  # 10240 bytes
+    ranges = []
+
+    class Body:
+        def __init__(self, chunk):
+            self.chunk = chunk
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def read(self):
+            return self.chunk
+
+    class FakeClient:
+        class exceptions:
+            ClientError = Exception
+
+        async def get_object(self, Bucket, Key, Range, IfMatch=None):
+            start, end = map(int, Range[len("bytes="):].split("-"))
+            ranges.append((start, end))
+            # parts after the first are pinned to the first part's version
+            assert (IfMatch is None) == (start == 0)
+            assert IfMatch in (None, '"v1"')
+            chunk = data[start:end + 1]
+            return {"Body": Body(chunk), "ETag": '"v1"', "ContentRange": f"bytes {start}-{start + len(chunk) - 1}/{len(data)}"}
+
+    async def fake_client():
+        return FakeClient()
+
+    monkeypatch.setattr(r2_fetch, "aioboto3", object())
+    monkeypatch.setattr(r2_fetch, "_get_async_client", fake_client)
+    monkeypatch.setattr(r2_fetch, "PART_SIZE", 4096)
+    assert await r2_fetch.get_object_bytes("b", "k") == data
+    assert sorted(ranges) == [(0, 4095), (4096, 8191), (8192, 10239)]
+
+    # small object: the first ranged GET is the only request
+    ranges.clear()
+    monkeypatch.setattr(r2_fetch, "PART_SIZE", 1 << 20)
+    assert await r2_fetch.get_object_bytes("b", "k") == data
+    assert len(ranges) == 1
+
+def test_pdfium_calls_are_serialised(monkeypatch):
+    import sys
+    import threading
+    import types
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services import parse_utils
+
+    active = []
+    overlaps = []
+
+    class FakePage:
+        def get_textpage(self):
+            return self
+
+        def get_text_range(self):
+            active.append(1)
+            overlaps.append(len(active) > 1)
+            threading.Event().wait(0.01)
+            active.pop()
+            return "text"
+
+        def close(self):
+            pass
+
+    class FakeDoc:
+        def __init__(self, b):
+            pass
+
+        def __iter__(self):
+            return iter([FakePage()])
+
+        def close(self):
+            pass
+
+    monkeypatch.setitem(sys.modules, "pypdfium2", types.SimpleNamespace(PdfDocument=FakeDoc))
+    with ThreadPoolExecutor(4) as ex:
+        assert list(ex.map(parse_utils.parse_pdf_bytes, [b"%PDF"] * 8)) == ["text"] * 8
+    assert not any(overlaps)
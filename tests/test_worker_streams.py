@@ -48,3 +48,37 @@ async def test_move_to_dlq_on_exceed(monkeypatch):
 
     # Verify xadd was called (DLQ entry made) when retries exceeded
     assert fake_client.xadd.called or fake_client.xreadgroup.called  # at minimum, we tried to read
+
+@pytest.mark.asyncio
+async def test_enqueue_trims_stream_and_batches_in_one_pipeline(monkeypatch):
+    calls = []
+
+    class FakePipe:
+        def __init__(self):
+            self.queued = []
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def xadd(self, name, fields, **kwargs):
+            self.queued.append((name, fields, kwargs))
+
+        async def execute(self):
+            calls.append(("pipeline", len(self.queued), self.queued[0][2]))
+            return [f"{i}-0" for i in range(len(self.queued))]
+
+    fake_client = MagicMock()
+    fake_client.xadd = AsyncMock(return_value="1-0")
+    fake_client.pipeline = MagicMock(side_effect=lambda transaction: FakePipe())
+    monkeypatch.setattr("app.services.queue._get_redis_client", lambda: fake_client)
+
+    await queue.enqueue_stream_job({"a": 1})
+    assert fake_client.xadd.call_args.kwargs == {"maxlen": queue.STREAM_MAXLEN, "approximate": True}
+
+    sids = await queue.enqueue_stream_jobs([{"a": 1}, {"a": 2}, {"a": 3}], ["k1", None, "k3"])
+    assert sids == ["0-0", "1-0", "2-0"]
+    assert calls == [("pipeline", 3, {"maxlen": queue.STREAM_MAXLEN, "approximate": True})]
+    fake_client.pipeline.assert_called_once_with(transaction=False)